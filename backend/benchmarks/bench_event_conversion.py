@@ -0,0 +1,94 @@
+"""
+Compare the old per-request event conversion in routes/chat.py with the
+validate-once path used now.
+
+Old path: raw dicts -> Event models by hand, then FastAPI's response_model
+handling (dump, re-validate, jsonable dump, json.dumps).
+New path: events validated once at ingestion, response built with
+model_construct and encoded with model_dump_json.
+
+Run from the backend directory:
+    python benchmarks/bench_event_conversion.py --events 500 --points 50
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.schemas import ChatResponse, Event, EventCategory, EventGeometry, EventSource
+
+
+def make_raw_events(count: int, points: int):
+    return [
+        {
+            "id": f"EONET_{i}",
+            "title": f"Event {i}",
+            "description": None,
+            "link": f"https://eonet.gsfc.nasa.gov/api/v2.1/events/EONET_{i}",
+            "categories": [{"id": 10, "title": "Severe Storms"}],
+            "geometries": [
+                {"date": "2024-01-15T00:00:00Z", "type": "Point", "coordinates": [-120.0 + p * 0.1, 30.0 + p * 0.05]}
+                for p in range(points)
+            ],
+            "sources": [{"id": "JTWC", "url": "https://www.metoc.navy.mil/jtwc/"}],
+            "closed": None,
+        }
+        for i in range(count)
+    ]
+
+
+def old_path(raw_events):
+    events = []
+    for event_data in raw_events:
+        categories = [EventCategory(id=c.get("id", 0), title=c.get("title", "Unknown Category")) for c in event_data.get("categories", [])]
+        geometries = [
+            EventGeometry(date=g.get("date"), type=g.get("type", "Point"), coordinates=g.get("coordinates", []))
+            for g in event_data.get("geometries", [])
+        ]
+        sources = [EventSource(id=s.get("id", ""), url=s.get("url", "")) for s in event_data.get("sources", [])]
+        events.append(Event(
+            id=event_data.get("id", ""),
+            title=event_data.get("title", "Unknown Event"),
+            description=event_data.get("description"),
+            link=event_data.get("link"),
+            categories=categories,
+            geometries=geometries,
+            sources=sources,
+            closed=event_data.get("closed"),
+        ))
+    response = ChatResponse(response="text", events=events)
+    # What FastAPI does with response_model=ChatResponse
+    validated = ChatResponse.model_validate(response.model_dump())
+    return json.dumps(validated.model_dump(mode="json")).encode()
+
+
+def new_path(events):
+    response = ChatResponse.model_construct(response="text", events=events, total=len(events), next_cursor=None)
+    return response.model_dump_json().encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--points", type=int, default=50, help="geometry points per event")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from services.eonet_service import EONETService
+
+    raw_events = make_raw_events(args.events, args.points)
+    events = [EONETService.parse_event(event) for event in raw_events]
+
+    old = timeit.timeit(lambda: old_path(raw_events), number=args.repeat) / args.repeat
+    new = timeit.timeit(lambda: new_path(events), number=args.repeat) / args.repeat
+    print(f"events={args.events} points/event={args.points}")
+    print(f"old per-request conversion: {old * 1000:8.2f} ms")
+    print(f"new pre-validated path:     {new * 1000:8.2f} ms")
+    print(f"speedup: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Measure how much request-path logging blocks the event loop.
+
+Compares the previous setup (StreamHandler + RotatingFileHandler called
+synchronously on the loop thread, f-string messages) with logging_config's
+queue-based pipeline (lazy %-formatting, JSON written by a listener thread,
+optional sampling).
+
+Many concurrent "requests" each log a few hot-path INFO messages while a
+monitor task measures how late its 1ms timer fires (event-loop lag).
+
+Run from the backend directory:
+    python benchmarks/bench_logging.py --requests 20000 --sample 0.1
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logging_config import TEXT_FORMAT, configure_logging, stop_logging
+
+logger = logging.getLogger("services.eonet_service")
+
+
+def configure_sync(log_file: str) -> None:
+    """The logging setup main.py used before the queue-based pipeline"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    formatter = logging.Formatter(TEXT_FORMAT)
+    for handler in (logging.StreamHandler(open(os.devnull, "w")), RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5)):
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+async def request(index: int, lazy: bool) -> None:
+    events = list(range(index % 50))
+    if lazy:
+        logger.info("Extracted intent: category=%s, days=%s, region=%s", "wildfires", 30, "all")
+        logger.info("Returning %d events from EONET event store", len(events))
+    else:
+        logger.info(f"Extracted intent: category={'wildfires'}, days={30}, region={'all'}")
+        logger.info(f"Returning {len(events)} events from EONET event store")
+    await asyncio.sleep(0)
+
+
+async def monitor_lag(lags: list, stop: asyncio.Event) -> None:
+    interval = 0.001
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run(requests: int, concurrency: int, lazy: bool) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lags, stop))
+    started = time.perf_counter()
+    for offset in range(0, requests, concurrency):
+        await asyncio.gather(*(request(index, lazy) for index in range(offset, min(offset + concurrency, requests))))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "lag_mean_ms": statistics.mean(lags) * 1000 if lags else 0.0,
+        "lag_p99_ms": lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+        "lag_max_ms": lags[-1] * 1000 if lags else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--sample", type=float, default=1.0, help="Sampling rate for the hot-path logger in the queued run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "bench.log")
+        configure_sync(log_file)
+        sync = asyncio.run(run(args.requests, args.concurrency, lazy=False))
+
+        sys.stderr = open(os.devnull, "w")
+        configure_logging(logging.INFO, log_file, log_format="json")
+        queued = asyncio.run(run(args.requests, args.concurrency, lazy=True))
+        stop_logging()
+
+        sampled = None
+        if args.sample < 1.0:
+            configure_logging(logging.INFO, log_file, log_format="json", sample_rates={logger.name: args.sample})
+            sampled = asyncio.run(run(args.requests, args.concurrency, lazy=True))
+            stop_logging()
+        sys.stderr = sys.__stderr__
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent, 2 INFO records each")
+    rows = [("sync handlers", sync), ("queue + JSON", queued)]
+    if sampled is not None:
+        rows.append((f"queue + {args.sample:g} sampling", sampled))
+    for name, result in rows:
+        print(
+            f"  {name:<24} {result['elapsed'] * 1000:8.1f} ms total  "
+            f"loop lag mean {result['lag_mean_ms']:.3f} ms  p99 {result['lag_p99_ms']:.3f} ms  max {result['lag_max_ms']:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Measure memory EONETService keeps alive in steady state, with and without the
+shared event pool.
+
+Once the snapshot has loaded, every open-event query of up to
+EONET_SNAPSHOT_DAYS is answered from it, so what stays allocated is:
+
+- the snapshot: its events and the EventCatalog indexes
+- the fetched snapshot and delta responses, cached for one refresh interval
+  so other workers can reuse them (parsed separately from the snapshot)
+
+Per-key upstream lists only exist for longer windows or closed events; that
+case is reported separately. The pool deduplicates events across these lists,
+it does not make a single event smaller.
+
+Run from the backend directory:
+    python benchmarks/bench_memory.py --events 2000 --points 20
+"""
+import argparse
+import copy
+import gc
+import os
+import sys
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+os.environ.setdefault("NASA_API_KEY", "benchmark")
+
+from benchmarks.mock_upstream import make_events
+from models.schemas import Event
+from services.eonet_service import EONETService
+from services.event_pool import EventPool
+from services.event_store import EventStore
+
+
+def measure(build: Callable[[], object]) -> int:
+    """Bytes still allocated once `build` has returned, while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def delta_response(raw_events: List[Dict], fraction: float) -> List[Dict]:
+    """Recently updated open events; every fourth one has gained a geometry since the snapshot"""
+    recent = [copy.deepcopy(raw) for raw in raw_events[: max(1, int(len(raw_events) * fraction))] if not raw["closed"]]
+    for raw in recent[::4]:
+        raw["geometries"].append({**raw["geometries"][-1], "coordinates": [0.0, 0.0]})
+    return recent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--points", type=int, default=20)
+    parser.add_argument("--delta", type=float, default=0.05, help="Fraction of events in each delta response")
+    args = parser.parse_args()
+
+    service = EONETService()
+    raw_events = make_events(args.events, args.points)
+    open_events = [raw for raw in raw_events if not raw["closed"]]
+    delta = delta_response(open_events, args.delta)
+    wildfires = [raw for raw in raw_events if raw["categories"][0]["id"] == 8]
+    print(f"{len(open_events)} open events x {args.points} points; delta responses of {len(delta)} events")
+
+    def steady_state(intern: Callable[[Event], Event], long_window: bool = False) -> object:
+        parse = lambda response: [intern(service.parse_event(raw)) for raw in response]
+        snapshot = parse(open_events)
+        store = EventStore(fetch=None)
+        store.load(snapshot)
+        # The memory cache backend keeps each fetched list for one refresh interval
+        cached = {"snapshot": snapshot, "delta_open": parse(delta)}
+        store.merge(cached["delta_open"], [])
+        if long_window:
+            cached["wildfires_730_open"] = parse(wildfires)
+            cached["all_730_closed"] = parse([raw for raw in raw_events if raw["closed"]])
+        return store, cached
+
+    def pooled(long_window: bool = False) -> Callable[[], object]:
+        def build() -> object:
+            pool = EventPool()
+            return pool, steady_state(pool.intern, long_window)
+        return build
+
+    # Import NumPy and fill the region membership cache outside the measurements
+    steady_state(lambda event: event, long_window=True)
+
+    snapshot_only = measure(lambda: [service.parse_event(raw) for raw in open_events])
+    print(f"  snapshot events alone                              {snapshot_only / 2**20:8.2f} MiB "
+          f"({snapshot_only / len(open_events) / 1024:.1f} KiB per event)")
+    for label, long_window in (("steady state", False), ("steady state + long-window per-key lists", True)):
+        separate = measure(lambda: steady_state(lambda event: event, long_window))
+        shared = measure(pooled(long_window))
+        print(f"  {label:<42} separate copies {separate / 2**20:8.2f} MiB, shared pool {shared / 2**20:8.2f} MiB "
+              f"({(separate - shared) / max(separate, 1):.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Cold-start benchmark for the backend.
+
+For each run, in fresh processes:
+
+- import: time to `import main` (which builds the app via create_app), and
+  whether heavy modules such as numpy were loaded by the import
+- cold start: spawns `uvicorn main:app` against benchmarks/mock_upstream.py
+  and measures the time from spawn until the server answers /api/health,
+  until /api/health/ready reports the event snapshot loaded, and the latency
+  of the first and second /api/chat requests
+
+Medians across runs are reported.
+
+Run from the backend directory:
+    python benchmarks/bench_startup.py --runs 5 --events 2000 --points 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import (
+    BACKEND_DIR, ensure_running, port_in_use, require_free_ports, start_process, wait_until_ready,
+)
+
+# Heavy modules that importing the app should not load; the lifespan loads them
+DEFERRED_MODULES = ("numpy", "services.eonet_service", "services.openrouter_service")
+
+IMPORT_SNIPPET = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "import_s": elapsed,
+    "modules": len(sys.modules),
+    "deferred_loaded": [name for name in {DEFERRED_MODULES!r} if name in sys.modules],
+    "services_built": main.app_services.constructed(),
+}}))
+"""
+
+
+def measure_import(env: Dict[str, str]) -> Dict[str, object]:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+async def poll(client: httpx.AsyncClient, url: str, process: subprocess.Popen, deadline: float) -> None:
+    while time.monotonic() < deadline:
+        ensure_running(process)
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.01)
+    raise RuntimeError(f"{url} did not answer 200 in time")
+
+
+async def measure_cold_start(api_port: int, env: Dict[str, str], log_path: str) -> Dict[str, float]:
+    api_url = f"http://127.0.0.1:{api_port}"
+    if port_in_use(api_port):
+        # Polling would otherwise time a server that is already running
+        raise RuntimeError(f"port {api_port} is already in use")
+    spawned = time.perf_counter()
+    api = start_process(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port), "--log-level", "warning"],
+        env, log_path,
+    )
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            deadline = time.monotonic() + 60
+            await poll(client, f"{api_url}/api/health", api, deadline)
+            listening = time.perf_counter() - spawned
+            await poll(client, f"{api_url}/api/health/ready", api, deadline)
+            ready = time.perf_counter() - spawned
+
+            chat_latencies: List[float] = []
+            for message in ("Show me wildfires in the past week", "Any volcanoes erupting this month?"):
+                started = time.perf_counter()
+                response = await client.post(f"{api_url}/api/chat", json={"message": message})
+                response.raise_for_status()
+                chat_latencies.append(time.perf_counter() - started)
+        return {"listening_s": listening, "ready_s": ready, "first_chat_s": chat_latencies[0], "second_chat_s": chat_latencies[1]}
+    finally:
+        api.terminate()
+        try:
+            api.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            api.kill()
+
+
+async def run(args: argparse.Namespace) -> None:
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+    tmp = tempfile.mkdtemp(prefix="terrachat-startup-")
+    env = {
+        **os.environ,
+        "OPENROUTER_API_KEY": os.environ.get("OPENROUTER_API_KEY", "benchmark"),
+        "NASA_API_KEY": os.environ.get("NASA_API_KEY", "benchmark"),
+        "EONET_BASE_URL": f"{mock_url}/eonet",
+        "OPENROUTER_BASE_URL": f"{mock_url}/openrouter",
+        "ENVIRONMENT": "production",
+        "RATE_LIMIT_ENABLED": "false",
+        "EONET_SNAPSHOT_PATH": "",
+        "LOG_FILE": os.path.join(tmp, "terrachat.log"),
+    }
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    print(
+        f"{'import main':<20} median {statistics.median(r['import_s'] for r in imports) * 1000:8.1f} ms  "
+        f"({imports[0]['modules']} modules; deferred modules loaded: {imports[0]['deferred_loaded'] or 'none'}; "
+        f"services built: {imports[0]['services_built'] or 'none'})"
+    )
+
+    mock = start_process(
+        [sys.executable, "benchmarks/mock_upstream.py", "--port", str(args.mock_port),
+         "--events", str(args.events), "--points", str(args.points)],
+        env, os.path.join(tmp, "mock.log"),
+    )
+    try:
+        await wait_until_ready(f"{mock_url}/calls", mock)
+        starts = [
+            await measure_cold_start(args.api_port, env, os.path.join(tmp, f"api-{run}.log"))
+            for run in range(args.runs)
+        ]
+    finally:
+        mock.terminate()
+        mock.wait(timeout=10)
+
+    for key, label in (("listening_s", "spawn -> /api/health"), ("ready_s", "spawn -> ready"),
+                       ("first_chat_s", "first /api/chat"), ("second_chat_s", "second /api/chat")):
+        print(f"{label:<20} median {statistics.median(s[key] for s in starts) * 1000:8.1f} ms")
+    print(f"{args.events} events x {args.points} points, {args.runs} runs; logs in {tmp}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--events", type=int, default=1000, help="Synthetic events served by the mock EONET")
+    parser.add_argument("--points", type=int, default=10, help="Geometry points per event")
+    parser.add_argument("--mock-port", type=int, default=8768)
+    parser.add_argument("--api-port", type=int, default=8012)
+    args = parser.parse_args()
+    require_free_ports(parser, args)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Load test for the backend against the local EONET/OpenRouter stand-in.
+
+Starts benchmarks/mock_upstream.py and the API (uvicorn main:app) as
+subprocesses, waits for the event store to be ready, then drives each
+endpoint at a fixed concurrency for a fixed duration and reports
+throughput, latency percentiles, status codes and server memory.
+
+Rate limiting is disabled for the API process (RATE_LIMIT_ENABLED=false).
+With --llm the API generates responses through the mock OpenRouter
+completions endpoint (LLM_GENERATION_ENABLED=true).
+
+Run from the backend directory:
+    python benchmarks/load_test.py --events 2000 --points 20 --latency 0.05 --concurrency 50 --duration 10
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHAT_MESSAGES = [
+    "Show me wildfires in the past week",
+    "Any volcanoes erupting this month?",
+    "Severe storms in Asia over the last year",
+    "What floods happened in South America recently?",
+    "Show me all natural events today",
+    "Landslides in Europe last month",
+    "Are there icebergs near Antarctica?",
+    "Hurricanes in North America this year",
+]
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def read_memory(pid: int) -> Dict[str, Optional[int]]:
+    """Current and peak resident set size in KiB, from /proc (Linux only)"""
+    memory: Dict[str, Optional[int]] = {"rss_kib": None, "peak_rss_kib": None}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    memory["rss_kib"] = int(line.split()[1])
+                elif line.startswith("VmHWM:"):
+                    memory["peak_rss_kib"] = int(line.split()[1])
+    except OSError:
+        pass
+    return memory
+
+
+def port_in_use(port: int) -> bool:
+    """Whether something already listens on the port, which would answer in place of the spawned server"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        # Like uvicorn, ignore connections left in TIME_WAIT by an earlier run
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("127.0.0.1", port))
+        except OSError:
+            return True
+    return False
+
+
+def require_free_ports(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    for option, port in (("--mock-port", args.mock_port), ("--api-port", args.api_port)):
+        if port_in_use(port):
+            parser.error(f"port {port} is already in use; pick a free one with {option}")
+
+
+def start_process(args: List[str], env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen(args, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def ensure_running(process: subprocess.Popen) -> None:
+    """Fail instead of waiting out a timeout when a spawned server has already exited"""
+    code = process.poll()
+    if code is not None:
+        raise RuntimeError(f"{' '.join(process.args[1:])} exited with code {code}")
+
+
+async def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            ensure_running(process)
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+async def drive(base_url: str, scenario: str, concurrency: int, duration: float) -> Dict[str, object]:
+    """Run `concurrency` closed-loop clients against one scenario for `duration` seconds"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    messages = itertools.cycle(CHAT_MESSAGES)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        deadline = time.monotonic() + duration
+
+        async def worker() -> None:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    if scenario == "chat":
+                        response = await client.post("/api/chat", json={"message": next(messages)})
+                    else:
+                        response = await client.get("/api/health/detailed")
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "statuses": dict(statuses),
+    }
+
+
+def format_memory(memory: Dict[str, Optional[int]]) -> str:
+    if memory["rss_kib"] is None:
+        return "memory n/a"
+    return f"rss {memory['rss_kib'] / 1024:.1f} MiB, peak {memory['peak_rss_kib'] / 1024:.1f} MiB"
+
+
+async def run(args: argparse.Namespace) -> None:
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    tmp = tempfile.mkdtemp(prefix="terrachat-bench-")
+
+    env = {
+        **os.environ,
+        "OPENROUTER_API_KEY": os.environ.get("OPENROUTER_API_KEY", "benchmark"),
+        "NASA_API_KEY": os.environ.get("NASA_API_KEY", "benchmark"),
+        "EONET_BASE_URL": f"{mock_url}/eonet",
+        "OPENROUTER_BASE_URL": f"{mock_url}/openrouter",
+        "ENVIRONMENT": "production",
+        "RATE_LIMIT_ENABLED": "false",
+        "EONET_SNAPSHOT_PATH": "",
+        "LOG_FILE": os.path.join(tmp, "terrachat.log"),
+        "LLM_GENERATION_ENABLED": "true" if args.llm else "false",
+    }
+    mock = start_process(
+        [sys.executable, "benchmarks/mock_upstream.py", "--port", str(args.mock_port),
+         "--events", str(args.events), "--points", str(args.points), "--latency", str(args.latency),
+         "--completion-latency", str(args.completion_latency)],
+        env, os.path.join(tmp, "mock.log"),
+    )
+    api = start_process(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"],
+        env, os.path.join(tmp, "api.log"),
+    )
+    try:
+        startup = time.perf_counter()
+        await wait_until_ready(f"{mock_url}/calls", mock)
+        await wait_until_ready(f"{api_url}/api/health/ready", api)
+        print(f"API ready in {time.perf_counter() - startup:.2f}s with {args.events} events x {args.points} points "
+              f"(upstream latency {args.latency * 1000:.0f} ms); {format_memory(read_memory(api.pid))}")
+
+        for scenario in args.scenarios:
+            # A short warm-up fills caches and connection pools before measuring
+            await drive(api_url, scenario, args.concurrency, min(1.0, args.duration))
+            result = await drive(api_url, scenario, args.concurrency, args.duration)
+            ensure_running(api)
+            print(
+                f"{scenario:<8} {result['requests']:>7} req  {result['rps']:>8.1f} rps  "
+                f"p50 {result['p50_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+                f"{format_memory(read_memory(api.pid))}  statuses {result['statuses']}"
+            )
+
+        async with httpx.AsyncClient() as client:
+            calls = (await client.get(f"{mock_url}/calls")).json()
+        print(f"Upstream calls: {calls}")
+    finally:
+        for process in (api, mock):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        print(f"Logs in {tmp}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1000, help="Synthetic events served by the mock EONET")
+    parser.add_argument("--points", type=int, default=10, help="Geometry points per event")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every mock upstream response")
+    parser.add_argument("--llm", action="store_true", help="Enable LLM generation against the mock completions endpoint")
+    parser.add_argument("--completion-latency", type=float, default=0.5, help="Seconds before a mock completion starts")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=["chat", "health"], default=["chat", "health"])
+    parser.add_argument("--mock-port", type=int, default=8765)
+    parser.add_argument("--api-port", type=int, default=8001)
+    args = parser.parse_args()
+    require_free_ports(parser, args)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Microbenchmarks for the hot functions of the chat pipeline:
+
+- OpenRouterService.extract_intent, with the intent memo cold and warm
+- EONETService._filter_events_by_category
+- the event-to-response conversion in routes/chat.py (paginate,
+  project_event, ChatResponse.model_construct, model_dump_json)
+
+Run from the backend directory:
+    python benchmarks/microbenchmarks.py --events 2000 --points 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+os.environ.setdefault("NASA_API_KEY", "benchmark")
+
+from benchmarks.load_test import CHAT_MESSAGES
+from benchmarks.mock_upstream import make_events
+from models.schemas import ChatResponse, Event
+from services.eonet_service import EONETService
+from services.intent_matcher import IntentMatcher
+from services.openrouter_service import OpenRouterService
+from services.pagination import excluded_fields, paginate, project_event
+
+EVENT_FIELDS = set(Event.model_fields)
+
+
+def report(name: str, seconds: float, number: int, unit: str = "call") -> None:
+    print(f"  {name:<44} {seconds / number * 1e6:10.2f} us/{unit}")
+
+
+def bench_extract_intent(number: int) -> None:
+    service = OpenRouterService()
+    loop = asyncio.new_event_loop()
+
+    def extract_all() -> None:
+        for message in CHAT_MESSAGES:
+            loop.run_until_complete(service.extract_intent(message))
+
+    def cold() -> None:
+        service.matcher = IntentMatcher()
+        extract_all()
+
+    calls = number * len(CHAT_MESSAGES)
+    report("extract_intent (cold memo, incl. compile)", timeit.timeit(cold, number=number), calls)
+    extract_all()
+    report("extract_intent (warm memo)", timeit.timeit(extract_all, number=number), calls)
+    loop.close()
+
+
+def bench_filter_by_category(service: EONETService, events, number: int) -> None:
+    for category in ("wildfires", "volcanoes"):
+        seconds = timeit.timeit(lambda: service._filter_events_by_category(events, category), number=number)
+        report(f"_filter_events_by_category({category!r})", seconds, number)
+
+
+def bench_conversion(events, number: int) -> None:
+    for geometry, fields, limit in (("full", None, 50), ("latest", None, 50), ("none", ["title"], 200)):
+        exclude = excluded_fields(fields, geometry, EVENT_FIELDS)
+
+        def convert() -> bytes:
+            page, next_cursor = paginate(events, None, limit)
+            response = ChatResponse.model_construct(
+                response="benchmark",
+                events=[project_event(event, geometry) for event in page],
+                total=len(events),
+                next_cursor=next_cursor,
+            )
+            return response.model_dump_json(exclude={"events": {"__all__": exclude}}).encode()
+
+        seconds = timeit.timeit(convert, number=number)
+        report(f"conversion geometry={geometry} limit={limit} fields={fields}", seconds, number, unit="response")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--points", type=int, default=20)
+    parser.add_argument("--number", type=int, default=200, help="Iterations per benchmark")
+    args = parser.parse_args()
+
+    service = EONETService()
+    events = service.parse_events(make_events(args.events, args.points))
+    print(f"{len(events)} events x {args.points} points, {args.number} iterations")
+    bench_extract_intent(args.number)
+    bench_filter_by_category(service, events, args.number)
+    bench_conversion(events, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Local stand-in for the EONET and OpenRouter APIs used by the load test.
+
+Serves a deterministic set of synthetic events with a configurable number of
+events, geometry points per event and added response latency:
+
+    EONET:      /eonet/events, /eonet/events/{id}, /eonet/categories
+    OpenRouter: /openrouter/models, /openrouter/chat/completions (streaming or not)
+
+Run from the backend directory:
+    python benchmarks/mock_upstream.py --port 8765 --events 2000 --points 20 --latency 0.05
+then point the backend at it with
+    EONET_BASE_URL=http://127.0.0.1:8765/eonet OPENROUTER_BASE_URL=http://127.0.0.1:8765/openrouter
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+CATEGORIES = [
+    (8, "Wildfires"),
+    (10, "Severe Storms"),
+    (12, "Volcanoes"),
+    (9, "Floods"),
+    (15, "Sea and Lake Ice"),
+    (14, "Landslides"),
+]
+
+COMPLETION_TEXT = "Here is a summary of the natural events that match your question from the mock model."
+
+
+def make_events(count: int, points: int, closed_every: int = 10) -> List[Dict[str, Any]]:
+    """Synthetic EONET events spread over the globe and the past year"""
+    now = datetime.now(timezone.utc)
+    events = []
+    for i in range(count):
+        category_id, category_title = CATEGORIES[i % len(CATEGORIES)]
+        lon = -170 + (i * 37) % 340
+        lat = -60 + (i * 13) % 120
+        age_days = i % 365
+        geometries = [
+            {
+                "date": (now - timedelta(days=age_days, hours=points - p)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "type": "Point",
+                "coordinates": [lon + p * 0.05, lat + p * 0.02],
+            }
+            for p in range(points)
+        ]
+        closed = (now - timedelta(days=age_days)).strftime("%Y-%m-%dT%H:%M:%SZ") if i % closed_every == closed_every - 1 else None
+        events.append({
+            "id": f"EONET_{i}",
+            "title": f"{category_title} event {i}",
+            "description": None,
+            "link": f"https://eonet.gsfc.nasa.gov/api/v2.1/events/EONET_{i}",
+            "categories": [{"id": category_id, "title": category_title}],
+            "geometries": geometries,
+            "sources": [{"id": "MOCK", "url": f"https://example.com/events/{i}"}],
+            "closed": closed,
+        })
+    return events
+
+
+def _latest_date(event: Dict[str, Any]) -> str:
+    return event["geometries"][-1]["date"] if event["geometries"] else ""
+
+
+def create_app(events: int = 1000, points: int = 10, latency: float = 0.0, completion_latency: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Mock EONET/OpenRouter")
+    all_events = make_events(events, points)
+    by_id = {event["id"]: event for event in all_events}
+    app.state.calls = {"events": 0, "event": 0, "categories": 0, "models": 0, "completions": 0}
+
+    async def delay() -> None:
+        if latency:
+            await asyncio.sleep(latency)
+
+    @app.get("/eonet/events")
+    async def list_events(request: Request):
+        app.state.calls["events"] += 1
+        await delay()
+        params = request.query_params
+        status = params.get("status", "open")
+        selected = [event for event in all_events if (event["closed"] is None) == (status == "open")]
+        if "category" in params:
+            category_id = int(params["category"])
+            selected = [event for event in selected if any(cat["id"] == category_id for cat in event["categories"])]
+        if "days" in params:
+            since = (datetime.now(timezone.utc) - timedelta(days=int(params["days"]))).strftime("%Y-%m-%dT%H:%M:%SZ")
+            selected = [event for event in selected if _latest_date(event) >= since]
+        return {"title": "EONET Events", "events": selected}
+
+    @app.get("/eonet/events/{event_id}")
+    async def get_event(event_id: str):
+        app.state.calls["event"] += 1
+        await delay()
+        if event_id not in by_id:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return by_id[event_id]
+
+    @app.get("/eonet/categories")
+    async def categories():
+        app.state.calls["categories"] += 1
+        await delay()
+        return {"categories": [{"id": category_id, "title": title} for category_id, title in CATEGORIES]}
+
+    @app.get("/openrouter/models")
+    async def models():
+        app.state.calls["models"] += 1
+        await delay()
+        return {"data": [{"id": "mock/model"}]}
+
+    @app.post("/openrouter/chat/completions")
+    async def completions(request: Request):
+        app.state.calls["completions"] += 1
+        body = await request.json()
+        tokens = COMPLETION_TEXT.split(" ")
+        if completion_latency:
+            await asyncio.sleep(completion_latency)
+        if not body.get("stream"):
+            return {"choices": [{"message": {"role": "assistant", "content": COMPLETION_TEXT}}]}
+
+        async def stream():
+            for i, token in enumerate(tokens):
+                chunk = {"choices": [{"delta": {"content": token if i == 0 else " " + token}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(0.01)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/calls")
+    async def calls():
+        return app.state.calls
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--events", type=int, default=1000, help="Number of synthetic events")
+    parser.add_argument("--points", type=int, default=10, help="Geometry points per event")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--completion-latency", type=float, default=0.0, help="Seconds before a chat completion starts")
+    args = parser.parse_args()
+    app = create_app(args.events, args.points, args.latency, args.completion_latency)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
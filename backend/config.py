@@ -8,6 +8,86 @@ class Settings:
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
     NASA_API_KEY = os.getenv("NASA_API_KEY")
     EONET_BASE_URL = os.getenv("EONET_BASE_URL", "https://eonet.gsfc.nasa.gov/api/v2.1")
+    OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+    # Shared HTTP connection pool settings
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+    # Logging: "json" or "text" lines, written to stderr and a rotating log file
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+    LOG_FILE = os.getenv("LOG_FILE", "terrachat.log")
+    # Fraction of DEBUG/INFO records kept per logger, e.g. "services.eonet_service=0.1"
+    LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+    # Per-upstream timeouts (seconds)
+    EONET_TIMEOUT = float(os.getenv("EONET_TIMEOUT", "10"))
+    OPENROUTER_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "15"))
+    HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))
+
+    # Background dependency probes (seconds between runs) and readiness threshold
+    HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "30"))
+    OPENROUTER_PROBE_INTERVAL = float(os.getenv("OPENROUTER_PROBE_INTERVAL", str(HEALTH_PROBE_INTERVAL)))
+    EONET_PROBE_INTERVAL = float(os.getenv("EONET_PROBE_INTERVAL", str(HEALTH_PROBE_INTERVAL)))
+    # /api/health/ready fails once the EONET event store snapshot is older than this
+    READINESS_MAX_SNAPSHOT_AGE = float(os.getenv("READINESS_MAX_SNAPSHOT_AGE", "900"))
+
+    # Upstream resilience: retries, retry budget, circuit breakers and hedging
+    UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "2"))
+    UPSTREAM_RETRY_BACKOFF = float(os.getenv("UPSTREAM_RETRY_BACKOFF", "0.2"))
+    UPSTREAM_RETRY_BACKOFF_MAX = float(os.getenv("UPSTREAM_RETRY_BACKOFF_MAX", "2"))
+    # Retries allowed per upstream call, averaged over recent traffic
+    UPSTREAM_RETRY_BUDGET = float(os.getenv("UPSTREAM_RETRY_BUDGET", "0.2"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+    # Start a second EONET request once the first exceeds this latency percentile (0 disables)
+    EONET_HEDGE_PERCENTILE = float(os.getenv("EONET_HEDGE_PERCENTILE", "95"))
+    # In-flight NASA/OpenRouter calls across all requests; callers wait up to UPSTREAM_QUEUE_TIMEOUT seconds for a slot
+    UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "16"))
+    UPSTREAM_QUEUE_TIMEOUT = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "2"))
+
+    # Background EONET event store
+    EONET_SNAPSHOT_DAYS = int(os.getenv("EONET_SNAPSHOT_DAYS", "365"))
+    EONET_REFRESH_INTERVAL = float(os.getenv("EONET_REFRESH_INTERVAL", "300"))
+    # Sync only opened/updated/closed events between full syncs of the whole window
+    EONET_INCREMENTAL_SYNC = os.getenv("EONET_INCREMENTAL_SYNC", "true").lower() == "true"
+    EONET_FULL_SYNC_INTERVAL = float(os.getenv("EONET_FULL_SYNC_INTERVAL", "3600"))
+    # Last-known-good snapshot file loaded at startup; set to an empty string to disable
+    EONET_SNAPSHOT_PATH = os.getenv("EONET_SNAPSHOT_PATH", "data/eonet_snapshot.json")
+
+    # Cache and rate-limit storage: "memory" (per process) or "redis" (shared across workers)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Disable only for local load testing
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    # Per-client token buckets, refilled over a minute. A request
+    # served from cache costs RATE_LIMIT_CACHED_COST tokens, otherwise RATE_LIMIT_UNCACHED_COST
+    RATE_LIMIT_CHAT_PER_MINUTE = float(os.getenv("RATE_LIMIT_CHAT_PER_MINUTE", "40"))
+    RATE_LIMIT_EVENTS_PER_MINUTE = float(os.getenv("RATE_LIMIT_EVENTS_PER_MINUTE", "30"))
+    RATE_LIMIT_CACHED_COST = float(os.getenv("RATE_LIMIT_CACHED_COST", "1"))
+    RATE_LIMIT_UNCACHED_COST = float(os.getenv("RATE_LIMIT_UNCACHED_COST", "4"))
+    RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+    # Seconds between syncs of per-worker buckets when CACHE_BACKEND=redis
+    RATE_LIMIT_SYNC_INTERVAL = float(os.getenv("RATE_LIMIT_SYNC_INTERVAL", "1"))
+
+    # Frontend files up to this size are held in memory with precompressed variants
+    STATIC_MEMORY_MAX_BYTES = int(os.getenv("STATIC_MEMORY_MAX_BYTES", str(512 * 1024)))
+
+    # LLM response generation through OpenRouter; the template path is used when disabled,
+    # when LLM_MAX_CONCURRENCY calls are already in flight or when LLM_LATENCY_BUDGET (seconds) is exceeded
+    LLM_GENERATION_ENABLED = os.getenv("LLM_GENERATION_ENABLED", "false").lower() == "true"
+    OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    LLM_LATENCY_BUDGET = float(os.getenv("LLM_LATENCY_BUDGET", "3"))
+    LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "200"))
+    # Generated responses keyed on (intent category, events digest)
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "600"))
+
+    # Encoded /api/chat responses kept per snapshot
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
     
     @classmethod
     def validate_required_keys(cls):
@@ -28,5 +108,3 @@ class Settings:
         print("✓ All required API keys are configured")
 
 settings = Settings()
-# Validate API keys on import
-settings.validate_required_keys()
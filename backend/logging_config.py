@@ -0,0 +1,131 @@
+import atexit
+import json
+import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line with timestamp, level, logger and message"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of DEBUG/INFO records from selected loggers.
+    Rates are matched on the longest logger-name prefix; warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def _rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            best = -1
+            for prefix, prefix_rate in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > best:
+                    rate, best = prefix_rate, len(prefix)
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves %-formatting to the listener thread.
+
+    The stock handler renders the message before enqueueing it, which would
+    keep that work on the event loop. Records are enqueued as they are; log
+    arguments are expected to be immutable values such as strings and numbers.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse 'logger=rate,logger=rate' into a mapping"""
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def configure_logging(level: int, log_file: str, log_format: str = "json", sample_rates: Optional[Dict[str, float]] = None) -> None:
+    """
+    Route all logging through an in-memory queue; console and rotating-file
+    output is formatted and written by a background listener thread so the
+    event loop never blocks on log I/O.
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    formatter = JSONFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers: List[logging.Handler] = [
+        logging.StreamHandler(),
+        # 10MB max, keep 5 backup files
+        RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    _queue_handler = queue_handler
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Detach the queue from the root logger, flush queued records and stop the listener thread"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -1,109 +1,224 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from routes import chat, health
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from routes import chat, events, health
+from services.app_services import app_services
+from services.http_client import http_clients
+from services.intent_matcher import intent_matcher
+from services.metrics import METRICS_CONTENT_TYPE, RATE_LIMIT_REJECTIONS, REQUEST_LATENCY, render_metrics, stats_collector
+from services.rate_limiter import RateLimitExceeded, rate_limiter
+from services.resilience import upstream_policies
+from services.static_files import StaticSite
+from config import settings
+from logging_config import configure_logging, parse_sample_rates, stop_logging
+from typing import Optional
+import asyncio
 import os
+import time
 import logging
-from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
-# Determine log level based on environment
-log_level = logging.DEBUG if os.getenv("ENVIRONMENT", "development").lower() == "development" else logging.INFO
-
-# Create rotating file handler (10MB max, keep 5 backup files)
-file_handler = RotatingFileHandler(
-    "terrachat.log", 
-    maxBytes=10*1024*1024,  # 10MB
-    backupCount=5
-)
-
-logging.basicConfig(
-    level=log_level,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        file_handler
-    ]
-)
-
-# Rate limiting configuration
-limiter = Limiter(key_func=get_remote_address)
-app = FastAPI(title="TerraChat API", version="1.0.0")
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-# CORS middleware - allow all origins for single deployment
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(health.router, prefix="/api", tags=["health"])
-app.include_router(chat.router, prefix="/api", tags=["chat"])
-
-# Serve frontend static files
-frontend_path = Path(__file__).parent.parent / "frontend" / "out"
 logger = logging.getLogger(__name__)
 
-# Try multiple possible frontend locations
-possible_paths = [
+# Possible frontend build locations, in order of preference
+FRONTEND_PATHS = [
     Path(__file__).parent.parent / "frontend" / "out",
     Path(__file__).parent.parent / "frontend" / ".next",
     Path(__file__).parent.parent / "frontend",
 ]
 
-frontend_found = False
-for path in possible_paths:
-    if path.exists():
-        logger.info(f"Found frontend at: {path}")
-        frontend_path = path
-        frontend_found = True
-        break
-
-if frontend_found:
-    # Mount static assets
-    static_path = frontend_path / "_next" / "static"
-    if static_path.exists():
-        app.mount("/_next/static", StaticFiles(directory=str(static_path)), name="static")
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> Response:
+    """Count rejections per route and tell the client when to retry"""
+    route = request.scope.get("route")
+    RATE_LIMIT_REJECTIONS.labels(getattr(route, "path", request.url.path)).inc()
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Rate limit exceeded. Please try again later."},
+        headers=exc.headers(),
+    )
+
+class RequestLatencyMiddleware:
+    """Record request latency per route template (not per raw path, to bound label cardinality)"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - started)
+
+class RateLimitHeadersMiddleware:
+    """Report the client's remaining rate-limit budget on rate-limited routes"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # The rate-limit dependency has recorded the bucket in the request state by now
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limiter.headers(Request(scope)).items():
+                    headers[name] = value
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+async def metrics() -> Response:
+    """Prometheus scrape endpoint"""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+def find_frontend() -> Optional[Path]:
+    """Return the first frontend build location that exists"""
+    for path in FRONTEND_PATHS:
+        if path.exists():
+            logger.info(f"Found frontend at: {path}")
+            return path
+    logger.warning("Frontend build not found! Make sure frontend is built.")
+    return None
+
+def mount_frontend(app: FastAPI, static_site: StaticSite) -> None:
+    """Serve the frontend from the in-memory route table, built on startup"""
+    frontend_path = static_site.root
     
     # Serve main pages
     @app.get("/")
-    async def serve_root():
+    async def serve_root(request: Request):
         """Serve the root index.html"""
-        index_path = frontend_path / "index.html"
-        if index_path.exists():
-            return FileResponse(str(index_path))
+        index = static_site.get("index.html")
+        if index is not None:
+            return index.response(request)
         return {"detail": "Frontend not found", "path": str(frontend_path)}
     
     @app.get("/{full_path:path}")
-    async def serve_frontend(full_path: str):
+    async def serve_frontend(request: Request, full_path: str):
         """Serve frontend files, defaulting to index.html for non-API routes"""
         if full_path.startswith("api"):
             return {"detail": "Not Found"}
         
+        asset = static_site.get(full_path)
+        if asset is not None:
+            return asset.response(request)
+        
         if full_path.startswith("_next"):
             return {"detail": "Static file not found"}
         
-        file_path = frontend_path / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(str(file_path))
-        
         # Fallback to index.html for SPA routing
-        index_path = frontend_path / "index.html"
-        if index_path.exists():
-            return FileResponse(str(index_path))
+        index = static_site.get("index.html")
+        if index is not None:
+            return index.response(request)
         
         return {"detail": "Not Found", "requested": full_path, "frontend_path": str(frontend_path)}
-else:
-    logger.warning("Frontend build not found! Make sure frontend is built.")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Validate configuration, build the services and start their background work
+    before serving; stop everything on shutdown.
+    """
+    # Determine log level based on environment
+    log_level = logging.DEBUG if os.getenv("ENVIRONMENT", "development").lower() == "development" else logging.INFO
+    
+    # Console and rotating file output are written from a background thread,
+    # started here so importing the app opens no files and starts no threads
+    configure_logging(
+        log_level,
+        settings.LOG_FILE,
+        log_format=settings.LOG_FORMAT,
+        sample_rates=parse_sample_rates(settings.LOG_SAMPLE_RATES),
+    )
+    settings.validate_required_keys()
+    await http_clients.start()
+    
+    static_site = app.state.static_site
+    if static_site is not None:
+        await asyncio.to_thread(static_site.build)
+    
+    # Services and their modules are loaded here rather than at import time
+    eonet_service = app_services.eonet
+    openrouter_service = app_services.openrouter
+    
+    # Counters the services already keep are read at scrape time
+    stats_collector.register_cache("eonet", eonet_service.cache.stats)
+    stats_collector.register_cache("response", app_services.response_cache.stats)
+    stats_collector.register_cache("intent", intent_matcher.stats)
+    stats_collector.register_cache("llm", openrouter_service.completion_cache_stats)
+    stats_collector.register_upstreams(upstream_policies.stats)
+    
+    await eonet_service.start()
+    health.health_monitor.start()
+    rate_limiter.start()
+    try:
+        yield
+    finally:
+        await rate_limiter.stop()
+        await health.health_monitor.stop()
+        await eonet_service.stop()
+        await http_clients.close()
+        stop_logging()
+
+def create_app() -> FastAPI:
+    """Build the application; services are constructed and started by the lifespan"""
+    app = FastAPI(title="TerraChat API", version="1.0.0", lifespan=lifespan)
+    app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+    
+    # CORS middleware - allow all origins for single deployment
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Let browser clients read the rate-limit backpressure headers
+        expose_headers=["Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"],
+    )
+    app.add_middleware(RateLimitHeadersMiddleware)
+    app.add_middleware(RequestLatencyMiddleware)
+    app.add_api_route("/metrics", metrics, include_in_schema=False)
+    
+    # Include routers
+    app.include_router(health.router, prefix="/api", tags=["health"])
+    app.include_router(chat.router, prefix="/api", tags=["chat"])
+    app.include_router(events.router, prefix="/api", tags=["events"])
+    
+    # Serve frontend static files; indexed on startup, answered from memory
+    frontend_path = find_frontend()
+    app.state.static_site = None
+    if frontend_path is not None:
+        app.state.static_site = StaticSite(frontend_path, max_memory_bytes=settings.STATIC_MEMORY_MAX_BYTES)
+        mount_frontend(app, app.state.static_site)
+    
+    return app
+
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
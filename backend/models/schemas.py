@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 
 class EventCategory(BaseModel):
@@ -27,13 +27,42 @@ class Event(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=500, description="Chat message (1-500 characters)")
+    cursor: Optional[str] = Field(None, description="Opaque cursor from a previous response's next_cursor")
+    limit: Optional[int] = Field(None, ge=1, le=200, description="Maximum number of events per page (1-200); all events when omitted")
+    geometry: Literal["full", "latest", "none"] = Field("full", description="Geometry projection for each event")
+    fields: Optional[List[str]] = Field(None, description="Event fields to include (id is always included)")
     
     @validator('message')
     def validate_message(cls, v):
         if not v or not v.strip():
             raise ValueError('Message cannot be empty or only whitespace')
         return v.strip()
+    
+    @validator('fields')
+    def validate_fields(cls, v):
+        if v is None:
+            return v
+        unknown = [field for field in v if field not in Event.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown event fields: {', '.join(unknown)}")
+        return v
 
 class ChatResponse(BaseModel):
     response: str
     events: List[Event]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class EventGeometryResponse(BaseModel):
+    id: str
+    geometries: List[EventGeometry]
+
+class ChatBatchRequest(BaseModel):
+    requests: List[ChatRequest] = Field(..., min_length=1, max_length=20, description="Chat requests to answer together (1-20)")
+
+class ChatBatchItem(BaseModel):
+    response: Optional[ChatResponse] = None
+    error: Optional[str] = None
+
+class ChatBatchResponse(BaseModel):
+    results: List[ChatBatchItem]
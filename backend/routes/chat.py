@@ -1,76 +1,98 @@
-from fastapi import APIRouter, HTTPException, Request
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from models.schemas import ChatRequest, ChatResponse, Event, EventCategory, EventGeometry, EventSource
-from services.openrouter_service import OpenRouterService
-from services.eonet_service import EONETService
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from models.schemas import ChatBatchRequest, ChatBatchResponse, ChatRequest, ChatResponse, Event
+from services.pagination import paginate, project_event, excluded_fields
+from services.app_services import app_services
+from services.response_cache import EncodedResponse, render_response
+from services.metrics import chat_stage
+from services.rate_limiter import rate_limiter
 import logging
 import httpx
-from typing import List, Dict, Any
+import json
+import os
+from typing import Hashable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-# Rate limiter instance
-limiter = Limiter(key_func=get_remote_address)
-
 router = APIRouter()
-openrouter_service = OpenRouterService()
-eonet_service = EONETService()
 
-@router.post("/chat", response_model=ChatResponse)
-@limiter.limit("10/minute")  # Allow 10 requests per minute per IP
-async def chat(request: Request, chat_request: ChatRequest) -> ChatResponse:
+EVENT_FIELDS = set(Event.model_fields)
+
+def _log_unexpected_error(where: str, e: Exception) -> None:
+    """Log an unexpected error; full stack traces only outside production"""
+    is_production = os.getenv("ENVIRONMENT", "development").lower() == "production"
+    logger.error(f"Unexpected error in {where}: {e}", exc_info=not is_production)
+
+def _response_cache_key(intent: Tuple[str, int, str], chat_request: ChatRequest) -> Hashable:
+    """Identical intents and projections produce identical bodies for a given snapshot"""
+    return (
+        *intent,
+        chat_request.cursor, chat_request.limit, chat_request.geometry,
+        tuple(chat_request.fields) if chat_request.fields is not None else None
+    )
+
+async def _encode_chat_response(chat_request: ChatRequest, category: str, events_data: List[Event]) -> Tuple[bytes, bool]:
+    """
+    Paginate, project, generate the answer and encode one ChatResponse as JSON bytes.
+    The flag is False when a template stood in for the LLM answer, so the body is not cached.
+    """
+    with chat_stage("conversion"):
+        # Only the requested page is serialized
+        page, next_cursor = paginate(events_data, chat_request.cursor, chat_request.limit)
+        
+        # Events were validated once at ingestion, so only projection copies are made here
+        events = [project_event(event, chat_request.geometry) for event in page]
+    
+    # Generate conversational response
+    with chat_stage("generate"):
+        response_text, cacheable = await app_services.openrouter.generate(chat_request.message, events_data, category)
+    
+    # Build without validation and encode straight to JSON bytes; returning a Response
+    # also skips FastAPI's response_model re-validation
+    chat_response = ChatResponse.model_construct(
+        response=response_text,
+        events=events,
+        total=len(events_data),
+        next_cursor=next_cursor
+    )
+    exclude = excluded_fields(chat_request.fields, chat_request.geometry, EVENT_FIELDS)
+    with chat_stage("serialize"):
+        return chat_response.model_dump_json(exclude={"events": {"__all__": exclude}}).encode(), cacheable
+
+# Chat routes share one token bucket per IP; cached answers cost less than uncached ones
+@router.post("/chat", response_model=ChatResponse, dependencies=[Depends(rate_limiter.limit("chat"))])
+async def chat(request: Request, chat_request: ChatRequest):
     try:
         # Extract intent from user message
-        category, days, region = await openrouter_service.extract_intent(chat_request.message)
+        with chat_stage("intent"):
+            category, days, region = await app_services.openrouter.extract_intent(chat_request.message)
         
-        # Fetch events from EONET
-        events_data = await eonet_service.get_events(category=category, days=days)
+        cache_key = _response_cache_key((category, days, region), chat_request)
+        snapshot_version = app_services.eonet.snapshot_version
+        if snapshot_version is not None:
+            with chat_stage("cache_lookup"):
+                cached = app_services.response_cache.get(cache_key, snapshot_version)
+            if cached is not None:
+                return render_response(request, cached)
         
-        # Convert to Event models
-        events: List[Event] = []
-        for event_data in events_data:
-            # Convert categories
-            categories = []
-            for cat in event_data.get("categories", []):
-                categories.append(EventCategory(
-                    id=cat.get("id", 0),
-                    title=cat.get("title", "Unknown Category")
-                ))
-            
-            # Convert geometries
-            geometries = []
-            for geom in event_data.get("geometries", []):
-                geometries.append(EventGeometry(
-                    date=geom.get("date"),
-                    type=geom.get("type", "Point"),
-                    coordinates=geom.get("coordinates", [])
-                ))
-            
-            # Convert sources
-            sources = []
-            for src in event_data.get("sources", []):
-                sources.append(EventSource(
-                    id=src.get("id", ""),
-                    url=src.get("url", "")
-                ))
-            
-            event = Event(
-                id=event_data.get("id", ""),
-                title=event_data.get("title", "Unknown Event"),
-                description=event_data.get("description"),
-                link=event_data.get("link"),
-                categories=categories,
-                geometries=geometries,
-                sources=sources,
-                closed=event_data.get("closed")
-            )
-            events.append(event)
+        # Answering without the response cache costs more of the client's rate-limit budget
+        rate_limiter.charge(request, rate_limiter.miss_cost)
+        
+        # Fetch events from EONET
+        with chat_stage("eonet_fetch"):
+            events_data = await app_services.eonet.get_events(category=category, days=days, region=region)
         
-        # Generate conversational response
-        response_text = await openrouter_service.generate_response(chat_request.message, events_data)
+        body, cacheable = await _encode_chat_response(chat_request, category, events_data)
         
-        return ChatResponse(response=response_text, events=events)
+        # Only responses the snapshot served are cached, so they can be invalidated on refresh;
+        # per-key upstream results may be fallbacks after an upstream failure
+        with chat_stage("encode"):
+            if snapshot_version is not None and cacheable and app_services.eonet.serves_from_store(days):
+                encoded = app_services.response_cache.put(cache_key, snapshot_version, body)
+            else:
+                # Served once, so only the negotiated encoding is compressed
+                encoded = EncodedResponse(body, precompress=False)
+        return render_response(request, encoded)
         
     except httpx.HTTPError as e:
         logger.error(f"HTTP error in chat endpoint: {e}")
@@ -79,11 +101,111 @@ async def chat(request: Request, chat_request: ChatRequest) -> ChatResponse:
         logger.error(f"Value error in chat endpoint: {e}")
         raise HTTPException(status_code=400, detail="Invalid request data. Please check your input.")
     except Exception as e:
-        # Only log full stack trace in development, not production
-        import os
-        is_production = os.getenv("ENVIRONMENT", "development").lower() == "production"
-        if is_production:
-            logger.error(f"Unexpected error in chat endpoint: {e}")
-        else:
-            logger.error(f"Unexpected error in chat endpoint: {e}", exc_info=True)
+        _log_unexpected_error("chat endpoint", e)
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+@router.post("/chat/batch", response_model=ChatBatchResponse, dependencies=[Depends(rate_limiter.limit("chat"))])
+async def chat_batch(request: Request, batch_request: ChatBatchRequest):
+    """
+    Answer several chat messages in one round-trip. Intents are extracted up front,
+    deduplicated into the fewest EONET queries, and each message gets its own
+    ChatResponse (or error) in `results`, in request order.
+    """
+    try:
+        with chat_stage("intent"):
+            intents = [await app_services.openrouter.extract_intent(item.message) for item in batch_request.requests]
+        
+        snapshot_version = app_services.eonet.snapshot_version
+        cache_keys = [_response_cache_key(intent, item) for intent, item in zip(intents, batch_request.requests)]
+        bodies: List[Optional[bytes]] = [None] * len(intents)
+        if snapshot_version is not None:
+            with chat_stage("cache_lookup"):
+                for index, cache_key in enumerate(cache_keys):
+                    cached = app_services.response_cache.get(cache_key, snapshot_version)
+                    if cached is not None:
+                        bodies[index] = cached.body
+        
+        pending = [index for index, body in enumerate(bodies) if body is None]
+        # Each item is charged like a separate /chat request; the first was paid on admission
+        rate_limiter.charge(request, rate_limiter.cached_cost * (len(intents) - 1) + rate_limiter.miss_cost * len(pending))
+        with chat_stage("eonet_fetch"):
+            events_by_intent = await app_services.eonet.get_events_batch([intents[index] for index in pending])
+        
+        results = []
+        for index, (intent, item) in enumerate(zip(intents, batch_request.requests)):
+            body = bodies[index]
+            if body is None:
+                try:
+                    body, cacheable = await _encode_chat_response(item, intent[0], events_by_intent[intent])
+                except ValueError as e:
+                    # A bad cursor or similar only fails its own item
+                    logger.warning(f"Value error in chat batch item {index}: {e}")
+                    results.append(b'{"response":null,"error":"Invalid request data. Please check your input."}')
+                    continue
+                if snapshot_version is not None and cacheable and app_services.eonet.serves_from_store(intent[1]):
+                    app_services.response_cache.put(cache_keys[index], snapshot_version, body)
+            results.append(b'{"response":' + body + b',"error":null}')
+        
+        with chat_stage("encode"):
+            encoded = EncodedResponse(b'{"results":[' + b",".join(results) + b"]}", precompress=False)
+        return render_response(request, encoded)
+        
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP error in chat batch endpoint: {e}")
+        raise HTTPException(status_code=503, detail="Unable to fetch data from external services. Please try again later.")
+    except ValueError as e:
+        logger.error(f"Value error in chat batch endpoint: {e}")
+        raise HTTPException(status_code=400, detail="Invalid request data. Please check your input.")
+    except Exception as e:
+        _log_unexpected_error("chat batch endpoint", e)
         raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again later.")
+
+def _sse(event: str, data: str) -> bytes:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+@router.post("/chat/stream", dependencies=[Depends(rate_limiter.limit("chat"))])
+async def chat_stream(request: Request, chat_request: ChatRequest) -> StreamingResponse:
+    """
+    Streaming variant of /chat using Server-Sent Events.
+    Emits `intent` as soon as it is extracted, then `token` messages as the response
+    text is generated, then `response` with the full text and paging info, then one
+    `event` message per event, and finally `done`.
+    Failures after the stream has started are reported as an `error` message.
+    """
+    async def stream():
+        try:
+            category, days, region = await app_services.openrouter.extract_intent(chat_request.message)
+            yield _sse("intent", json.dumps({"category": category, "days": days, "region": region}))
+            
+            events_data = await app_services.eonet.get_events(category=category, days=days, region=region)
+            page, next_cursor = paginate(events_data, chat_request.cursor, chat_request.limit)
+            chunks = []
+            async for token in app_services.openrouter.stream_response(chat_request.message, events_data, category):
+                chunks.append(token)
+                yield _sse("token", json.dumps({"text": token}))
+            response_text = "".join(chunks)
+            yield _sse("response", json.dumps({"response": response_text, "total": len(events_data), "next_cursor": next_cursor}))
+            
+            # Serialize events one at a time so the first ones go out before the rest are encoded
+            exclude = excluded_fields(chat_request.fields, chat_request.geometry, EVENT_FIELDS)
+            for event in page:
+                yield _sse("event", project_event(event, chat_request.geometry).model_dump_json(exclude=exclude))
+            yield _sse("done", "{}")
+            
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error in chat stream: {e}")
+            yield _sse("error", json.dumps({"detail": "Unable to fetch data from external services. Please try again later."}))
+        except ValueError as e:
+            logger.error(f"Value error in chat stream: {e}")
+            yield _sse("error", json.dumps({"detail": "Invalid request data. Please check your input."}))
+        except Exception as e:
+            _log_unexpected_error("chat stream", e)
+            yield _sse("error", json.dumps({"detail": "An unexpected error occurred. Please try again later."}))
+    
+    # Streamed answers never come from the response cache
+    rate_limiter.charge(request, rate_limiter.miss_cost)
+    
+    # Disable proxy buffering so messages reach the client as they are produced
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=headers)
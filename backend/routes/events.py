@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from models.schemas import EventGeometryResponse
+from services.app_services import app_services
+from services.rate_limiter import rate_limiter
+import logging
+import httpx
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/events/{event_id}/geometry", response_model=EventGeometryResponse, dependencies=[Depends(rate_limiter.limit("events"))])
+async def get_event_geometry(request: Request, event_id: str) -> EventGeometryResponse:
+    """Full geometry track for one event, for clients that requested a reduced projection in /chat"""
+    try:
+        event = await app_services.eonet.get_event(event_id)
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP error fetching geometry for event {event_id}: {e}")
+        raise HTTPException(status_code=503, detail="Unable to fetch data from external services. Please try again later.")
+    
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    return EventGeometryResponse(id=event.id, geometries=event.geometries)
@@ -1,7 +1,12 @@
 from fastapi import APIRouter, HTTPException
-import httpx
-import asyncio
+from fastapi.responses import JSONResponse
 from config import settings
+from services.health_monitor import HealthMonitor
+from services.http_client import http_clients
+from services.app_services import app_services
+from services.intent_matcher import intent_matcher
+from services.rate_limiter import rate_limiter
+from services.resilience import upstream_policies
 import logging
 
 router = APIRouter()
@@ -10,9 +15,9 @@ logger = logging.getLogger(__name__)
 async def check_openrouter_api():
     """Check if OpenRouter API is accessible"""
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get("https://openrouter.ai/api/v1/models")
-            return response.status_code == 200
+        client = http_clients.get("openrouter")
+        response = await client.get("/models", timeout=settings.HEALTH_PROBE_TIMEOUT)
+        return response.status_code == 200
     except Exception as e:
         logger.warning(f"OpenRouter API check failed: {e}")
         return False
@@ -20,18 +25,38 @@ async def check_openrouter_api():
 async def check_nasa_eonet_api():
     """Check if NASA EONET API is accessible"""
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{settings.EONET_BASE_URL}/categories")
-            return response.status_code == 200
+        client = http_clients.get("eonet")
+        response = await client.get("/categories", timeout=settings.HEALTH_PROBE_TIMEOUT)
+        return response.status_code == 200
     except Exception as e:
         logger.warning(f"NASA EONET API check failed: {e}")
         return False
 
+health_monitor = HealthMonitor()
+health_monitor.register("openrouter_api", check_openrouter_api, settings.OPENROUTER_PROBE_INTERVAL)
+health_monitor.register("nasa_eonet_api", check_nasa_eonet_api, settings.EONET_PROBE_INTERVAL)
+
 @router.get("/health")
 async def health_check():
     """Basic health check"""
     return {"status": "healthy", "message": "TerraChat API is running"}
 
+@router.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness check for load balancers: ready once the EONET event store holds
+    a snapshot no older than READINESS_MAX_SNAPSHOT_AGE. Makes no upstream calls.
+    """
+    store = app_services.eonet.store
+    ready = store.ready and store.age <= settings.READINESS_MAX_SNAPSHOT_AGE
+    body = {
+        "ready": ready,
+        "snapshot_age": round(store.age, 1) if store.ready else None,
+        "snapshot_version": app_services.eonet.snapshot_version,
+        "events": len(store.catalog),
+    }
+    return JSONResponse(content=body, status_code=200 if ready else 503)
+
 @router.get("/health/detailed")
 async def detailed_health_check():
     """Detailed health check including external API dependencies"""
@@ -45,25 +70,10 @@ async def detailed_health_check():
         "issues": []
     }
     
-    # Check external APIs concurrently
-    openrouter_healthy, nasa_healthy = await asyncio.gather(
-        check_openrouter_api(),
-        check_nasa_eonet_api(),
-        return_exceptions=True
-    )
-    
-    # Handle exceptions
-    if isinstance(openrouter_healthy, Exception):
-        health_status["dependencies"]["openrouter_api"] = False
-        health_status["issues"].append(f"OpenRouter API error: {openrouter_healthy}")
-    else:
-        health_status["dependencies"]["openrouter_api"] = openrouter_healthy
-    
-    if isinstance(nasa_healthy, Exception):
-        health_status["dependencies"]["nasa_eonet_api"] = False
-        health_status["issues"].append(f"NASA EONET API error: {nasa_healthy}")
-    else:
-        health_status["dependencies"]["nasa_eonet_api"] = nasa_healthy
+    # Probe results are refreshed in the background; serving them costs no upstream calls
+    results = await health_monitor.results()
+    health_status["dependencies"]["openrouter_api"] = results["openrouter_api"]
+    health_status["dependencies"]["nasa_eonet_api"] = results["nasa_eonet_api"]
     
     # Determine overall health
     if not health_status["dependencies"]["openrouter_api"]:
@@ -77,6 +87,15 @@ async def detailed_health_check():
     if not health_status["dependencies"]["openrouter_api"] and not health_status["dependencies"]["nasa_eonet_api"]:
         health_status["status"] = "unhealthy"
     
+    health_status["probes"] = health_monitor.stats()
+    health_status["http_pools"] = http_clients.pool_stats()
+    health_status["upstreams"] = upstream_policies.stats()
+    health_status["rate_limit"] = rate_limiter.stats()
+    health_status["eonet_cache"] = app_services.eonet.cache_stats()
+    health_status["response_cache"] = app_services.response_cache.stats()
+    health_status["intent_cache"] = intent_matcher.stats()
+    health_status["llm"] = app_services.openrouter.completion_cache_stats()
+    
     from datetime import datetime
     health_status["timestamp"] = datetime.utcnow().isoformat()
     
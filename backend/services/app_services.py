@@ -0,0 +1,43 @@
+from functools import cached_property
+from typing import TYPE_CHECKING, List
+from config import settings
+
+if TYPE_CHECKING:
+    from services.eonet_service import EONETService
+    from services.openrouter_service import OpenRouterService
+    from services.response_cache import ResponseCache
+
+_SERVICES = ("eonet", "openrouter", "response_cache")
+
+
+class AppServices:
+    """
+    Application services, constructed on first access.
+
+    Each service module is imported only when the service is first needed, so
+    importing the routes stays cheap. The application lifespan builds and starts
+    them before serving; scripts and benchmarks get the same instances lazily.
+    """
+
+    @cached_property
+    def eonet(self) -> "EONETService":
+        from services.eonet_service import EONETService
+        return EONETService()
+
+    @cached_property
+    def openrouter(self) -> "OpenRouterService":
+        from services.openrouter_service import OpenRouterService
+        return OpenRouterService()
+
+    @cached_property
+    def response_cache(self) -> "ResponseCache":
+        # Encoded /api/chat responses, invalidated when the EONET snapshot changes
+        from services.response_cache import ResponseCache
+        return ResponseCache(maxsize=settings.RESPONSE_CACHE_SIZE)
+
+    def constructed(self) -> List[str]:
+        """Names of the services built so far"""
+        return [name for name in _SERVICES if name in self.__dict__]
+
+
+app_services = AppServices()
@@ -0,0 +1,205 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from cachetools import LRUCache
+from typing import Any, Callable, Dict, Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CountingLRUCache(LRUCache):
+    """LRUCache that counts entries evicted to make room for new ones"""
+
+    evictions = 0
+
+    def popitem(self):
+        self.evictions += 1
+        return super().popitem()
+
+    def clear(self) -> None:
+        # clear() pops every item; those are not capacity evictions
+        evictions = self.evictions
+        super().clear()
+        self.evictions = evictions
+
+
+class CacheBackend(ABC):
+    """
+    Interface for caches that may be shared between worker processes.
+
+    Values are Python objects; shared implementations encode them with the
+    codec they were created with. `acquire_lock`/`release_lock` provide a
+    best-effort mutex so only one worker refreshes a shared entry at a time.
+    """
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str, amount: float, ttl: float) -> Optional[float]:
+        """Add `amount` to a numeric counter, (re)setting its expiry; None if the backend is unavailable"""
+
+    async def release_lock(self, key: str) -> None:
+        await self.delete(key)
+
+    async def close(self) -> None:
+        pass
+
+    def _record(self, value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "hits": self.hits, "misses": self.misses}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU cache with per-entry expiry"""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = 100) -> None:
+        super().__init__()
+        self._entries = CountingLRUCache(maxsize=maxsize)
+
+    def _get_live(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._record(self._get_live(key))
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        if self._get_live(key) is not None:
+            return False
+        self._entries[key] = (time.monotonic() + ttl, True)
+        return True
+
+    async def incr(self, key: str, amount: float, ttl: float) -> Optional[float]:
+        total = (self._get_live(key) or 0.0) + amount
+        self._entries[key] = (time.monotonic() + ttl, total)
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "entries": len(self._entries), "evictions": self._entries.evictions}
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared across workers and nodes through any Redis-protocol server.
+    An existing asyncio client (e.g. fakeredis) can be passed in instead of a URL.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        namespace: str = "terrachat",
+        dumps: Optional[Callable[[Any], bytes]] = None,
+        loads: Optional[Callable[[bytes], Any]] = None,
+        client: Any = None,
+    ) -> None:
+        super().__init__()
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self._client = client
+        self._namespace = namespace
+        self._dumps = dumps
+        self._loads = loads
+
+    def _key(self, key: str) -> str:
+        return f"{self._namespace}:{key}"
+
+    # A shared cache outage degrades to uncached operation instead of failing requests
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self._client.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache get failed for '{key}': {e}")
+            raw = None
+        return self._record(self._loads(raw) if raw is not None else None)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            await self._client.set(self._key(key), self._dumps(value), px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            logger.warning(f"Redis cache set failed for '{key}': {e}")
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._client.delete(self._key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed for '{key}': {e}")
+
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        try:
+            return bool(await self._client.set(self._key(key), b"1", nx=True, px=max(1, int(ttl * 1000))))
+        except Exception as e:
+            # Without a shared lock every worker may refresh; that is still correct
+            logger.warning(f"Redis lock failed for '{key}': {e}")
+            return True
+
+    async def incr(self, key: str, amount: float, ttl: float) -> Optional[float]:
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.incrbyfloat(self._key(key), amount)
+                pipe.pexpire(self._key(key), max(1, int(ttl * 1000)))
+                total, _ = await pipe.execute()
+            return float(total)
+        except Exception as e:
+            logger.warning(f"Redis counter update failed for '{key}': {e}")
+            return None
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_cache_backend(
+    namespace: str,
+    dumps: Callable[[Any], bytes],
+    loads: Callable[[bytes], Any],
+    maxsize: int = 100,
+) -> CacheBackend:
+    """Build the cache backend selected by CACHE_BACKEND ('memory' or 'redis')"""
+    if settings.CACHE_BACKEND == "redis":
+        logger.info(f"Using shared Redis cache for '{namespace}'")
+        return RedisCacheBackend(settings.REDIS_URL, f"terrachat:{namespace}", dumps, loads)
+    return MemoryCacheBackend(maxsize=maxsize)
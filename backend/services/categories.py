@@ -0,0 +1,50 @@
+from typing import Dict, List
+
+# Canonical category names (as returned by extract_intent) -> EONET category ids
+CATEGORY_IDS: Dict[str, int] = {
+    "wildfires": 8,
+    "volcanoes": 12,
+    "floods": 9,
+    "storms": 10,
+    "earthquakes": 16,
+    "drought": 6,
+    "landslides": 14,
+    "snow": 17,
+    "ice": 15,
+    "dust": 7,
+    "manmade": 19,
+    "temperature": 18,
+    "water color": 13,
+}
+
+# Words and phrases referring to each category, including plurals and the
+# EONET category titles. Categories are listed in detection priority order:
+# when a message mentions several, the earliest one here wins.
+CATEGORY_SYNONYMS: Dict[str, List[str]] = {
+    "wildfires": ["wildfire", "wildfires", "forest fire", "forest fires", "bushfire", "bushfires"],
+    "volcanoes": ["volcano", "volcanoes", "volcanos", "volcanic", "eruption", "eruptions"],
+    "floods": ["flood", "floods", "flooding", "flooded"],
+    "storms": [
+        "storm", "storms", "severe storm", "severe storms", "thunderstorm", "thunderstorms",
+        "snowstorm", "snowstorms", "hurricane", "hurricanes", "typhoon", "typhoons",
+        "cyclone", "cyclones", "tornado", "tornadoes",
+    ],
+    "earthquakes": ["earthquake", "earthquakes", "quake", "quakes"],
+    "drought": ["drought", "droughts"],
+    "landslides": ["landslide", "landslides", "mudslide", "mudslides"],
+    "snow": ["snow", "snowfall"],
+    "ice": ["ice", "iceberg", "icebergs", "sea ice", "sea and lake ice"],
+    "dust": ["dust", "dust and haze", "haze"],
+    "manmade": ["manmade", "man-made"],
+    "temperature": ["temperature", "temperatures", "temperature extremes", "heatwave", "heatwaves", "heat wave", "heat waves"],
+    "water color": ["water color"],
+}
+
+
+def category_id_mapping() -> Dict[str, int]:
+    """Every category name and synonym -> EONET category id"""
+    mapping = dict(CATEGORY_IDS)
+    for category, synonyms in CATEGORY_SYNONYMS.items():
+        for synonym in synonyms:
+            mapping[synonym] = CATEGORY_IDS[category]
+    return mapping
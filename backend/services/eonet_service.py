@@ -1,90 +1,331 @@
+import asyncio
 import httpx
 import os
-from cachetools import TTLCache
-from typing import List, Dict, Any
+import random
+import time
+from cachetools import LRUCache, TTLCache
+from typing import List, Dict, Any, Optional, Tuple
 import logging
+from pydantic import TypeAdapter, ValidationError
+from config import settings
+from models.schemas import Event
+from services.cache_backend import create_cache_backend
+from services.categories import category_id_mapping
+from services.http_client import http_clients
+from services.event_catalog import latest_geometry_timestamp
+from services.event_pool import event_pool
+from services.event_store import EventStore
+from services.regions import region_classifier
+from services.resilience import upstream_policies
+from services.single_flight import SingleFlight
+from services.snapshot_file import SnapshotFile
 
 logger = logging.getLogger(__name__)
 
+# Cached keys are refreshed at a random point within the last
+# 10-20% of their TTL to avoid synchronized expiry
+EARLY_REFRESH_FRACTION = 0.1
+
+CACHE_TTL = 300  # 5 minutes cache
+
+# How long to wait for another worker that is fetching the shared snapshot
+SNAPSHOT_LOCK_TTL = 30
+SNAPSHOT_WAIT_ATTEMPTS = 10
+
+# Encodes cached event lists for shared cache backends
+EVENT_LIST_ADAPTER = TypeAdapter(List[Event])
+
 class EONETService:
     def __init__(self) -> None:
         self.base_url = os.getenv("EONET_BASE_URL", "https://eonet.gsfc.nasa.gov/api/v2.1")
         self.api_key = os.getenv("NASA_API_KEY")
         if not self.api_key:
             logger.warning("NASA_API_KEY not found in environment variables")
-        self.cache = TTLCache(maxsize=100, ttl=300)  # 5 minutes cache
-        
-        # Map category names to EONET category IDs
-        self.category_mapping = {
-            "drought": 6,
-            "dust": 7,
-            "dust and haze": 7,
-            "earthquakes": 16,
-            "floods": 9,
-            "landslides": 14,
-            "manmade": 19,
-            "ice": 15,
-            "sea and lake ice": 15,
-            "storms": 10,
-            "severe storms": 10,
-            "snow": 17,
-            "temperature": 18,
-            "temperature extremes": 18,
-            "volcanoes": 12,
-            "water color": 13,
-            "wildfires": 8
-        }
+        # Per-key event cache, shared across workers when CACHE_BACKEND=redis
+        self.cache = create_cache_backend("eonet", EVENT_LIST_ADAPTER.dump_json, self._load_event_list)
+        self._refresh_at = TTLCache(maxsize=100, ttl=CACHE_TTL)
+        self.single_flight = SingleFlight()
+        self.early_refreshes = 0
+        # Last successful result per key, served when the upstream is failing
+        self._last_good = LRUCache(maxsize=100)
+        # Circuit breaker, retries and hedging shared by every EONET call
+        self.upstream = upstream_policies.get("eonet")
+        
+        # Map category names and synonyms to EONET category IDs
+        self.category_mapping = category_id_mapping()
+        
+        # Background-refreshed snapshot of open events, queried locally
+        self.store = EventStore(
+            self.fetch_snapshot,
+            window_days=settings.EONET_SNAPSHOT_DAYS,
+            refresh_interval=settings.EONET_REFRESH_INTERVAL,
+            snapshot_file=SnapshotFile(settings.EONET_SNAPSHOT_PATH) if settings.EONET_SNAPSHOT_PATH else None,
+            fetch_delta=self.fetch_delta if settings.EONET_INCREMENTAL_SYNC else None,
+            full_sync_interval=settings.EONET_FULL_SYNC_INTERVAL,
+        )
+        
+    async def start(self) -> None:
+        """Restore the last persisted snapshot, then start background ingestion"""
+        await self.store.restore()
+        self.store.start()
+        
+    async def stop(self) -> None:
+        await self.store.stop()
+        await self.cache.close()
+        
+    @property
+    def snapshot_version(self) -> Optional[int]:
+        """Version of the open-event snapshot answering queries, or None before it has loaded"""
+        return self.store.version if self.store.ready else None
+        
+    @staticmethod
+    def parse_event(event_data: Dict[str, Any]) -> Event:
+        """
+        Validate a raw EONET event into an Event model, filling in defaults for missing fields.
+        This is the only place events are validated; downstream code reuses the models as-is.
+        """
+        return Event(
+            id=event_data.get("id", ""),
+            title=event_data.get("title", "Unknown Event"),
+            description=event_data.get("description"),
+            link=event_data.get("link"),
+            categories=[
+                {"id": cat.get("id", 0), "title": cat.get("title", "Unknown Category")}
+                for cat in event_data.get("categories", [])
+            ],
+            geometries=[
+                {"date": geom.get("date"), "type": geom.get("type", "Point"), "coordinates": geom.get("coordinates", [])}
+                for geom in event_data.get("geometries", [])
+            ],
+            sources=[
+                {"id": src.get("id", ""), "url": src.get("url", "")}
+                for src in event_data.get("sources", [])
+            ],
+            closed=event_data.get("closed")
+        )
+        
+    def parse_events(self, events_data: List[Dict[str, Any]]) -> List[Event]:
+        """
+        Validate raw EONET events, skipping any that do not fit the Event schema.
+        Events are interned in the shared pool, so every cache holds one copy of each.
+        """
+        events = []
+        for event_data in events_data:
+            try:
+                events.append(event_pool.intern(self.parse_event(event_data)))
+            except ValidationError as e:
+                logger.warning(f"Skipping invalid EONET event {event_data.get('id')}: {e}")
+        return events
+        
+    @staticmethod
+    def _load_event_list(raw: bytes) -> List[Event]:
+        """Decode an event list from a shared cache backend into pooled events"""
+        return [event_pool.intern(event) for event in EVENT_LIST_ADAPTER.validate_json(raw)]
+        
+    async def _fetch_events(self, params: Dict[str, Any], hedge: bool = False) -> List[Event]:
+        """
+        Fetch and validate events from the EONET API, raising on HTTP errors.
+        Only latency-sensitive request-path lookups are hedged; background syncs are not.
+        """
+        if self.api_key:
+            params = {**params, "api_key": self.api_key}
+        client = http_clients.get("eonet")
+        
+        async def request() -> httpx.Response:
+            response = await client.get("/events", params=params)
+            response.raise_for_status()
+            return response
+        
+        response = await self.upstream.call(request, hedge=hedge)
+        return self.parse_events(response.json().get("events", []))
+        
+    async def _fetch_shared(self, key: str, params: Dict[str, Any]) -> List[Event]:
+        """
+        Fetch an event list that every worker needs for the current refresh interval.
+        With a shared cache, the worker holding the lock fetches from the upstream and
+        publishes the result; other workers pick it up instead of fetching themselves.
+        """
+        lock_key = f"{key}_lock"
+        for _ in range(SNAPSHOT_WAIT_ATTEMPTS):
+            events = await self.cache.get(key)
+            if events is not None:
+                return events
+            if await self.cache.acquire_lock(lock_key, SNAPSHOT_LOCK_TTL):
+                try:
+                    events = await self._fetch_events(params)
+                    await self.cache.set(key, events, self.store.refresh_interval)
+                    return events
+                finally:
+                    await self.cache.release_lock(lock_key)
+            await asyncio.sleep(1)
+        
+        logger.warning(f"Timed out waiting for another worker's EONET '{key}', fetching directly")
+        return await self._fetch_events(params)
+        
+    async def fetch_snapshot(self, days: int) -> List[Event]:
+        """Fetch the full open-event set for the given window"""
+        return await self._fetch_shared(f"snapshot_{days}", {"status": "open", "days": days})
+        
+    async def fetch_delta(self, days: int) -> Tuple[List[Event], List[Event]]:
+        """Fetch the open events updated and the events closed within the past `days`"""
+        updated, closed = await asyncio.gather(
+            self._fetch_shared(f"delta_open_{days}", {"status": "open", "days": days}),
+            self._fetch_shared(f"delta_closed_{days}", {"status": "closed", "days": days}),
+        )
+        return updated, closed
+        
+    async def get_event(self, event_id: str) -> Optional[Event]:
+        """Look up a single event, from the snapshot if present, otherwise from the upstream"""
+        event = self.store.catalog.get(event_id)
+        if event is not None:
+            return event
+        client = http_clients.get("eonet")
+        params = {"api_key": self.api_key} if self.api_key else None
         
-    async def get_events(self, category: str = None, days: int = 30, status: str = "open") -> List[Dict[str, Any]]:
+        async def request() -> httpx.Response:
+            response = await client.get(f"/events/{event_id}", params=params)
+            if response.status_code != 404:
+                response.raise_for_status()
+            return response
+        
+        response = await self.upstream.call(request, hedge=True)
+        if response.status_code == 404:
+            return None
+        return self.parse_event(response.json())
+        
+    def serves_from_store(self, days: int, status: str = "open") -> bool:
+        """
+        Whether get_events answers from the local snapshot. Other answers come from
+        the per-key upstream cache and may be fallbacks after an upstream failure.
+        """
+        return status == "open" and self.store.ready and days <= self.store.window_days
+        
+    async def get_events(self, category: str = None, days: int = 30, status: str = "open", region: str = None) -> List[Event]:
+        # Open events are answered from the indexed local snapshot once it has loaded
+        if self.serves_from_store(days, status):
+            category_id = self.category_mapping.get(category.lower()) if category else None
+            events = self.store.query(days, category_id, region)
+            logger.debug("Returning %d events from EONET event store", len(events))
+            return events
+        
+        events = await self._get_cached_events(category, days, status)
+        return region_classifier.filter(events, region)
+    
+    async def get_events_batch(self, intents: List[Tuple[str, int, str]]) -> Dict[Tuple[str, int, str], List[Event]]:
+        """
+        Answer several (category, days, region) intents with the fewest upstream queries.
+        Duplicate intents are answered once. Intents the snapshot can serve are answered
+        from it; for the rest one uncategorized fetch for the widest window is made and
+        filtered locally per intent.
+        """
+        unique = list(dict.fromkeys(intents))
+        from_store = [intent for intent in unique if self.serves_from_store(intent[1])]
+        answers = await asyncio.gather(*(self.get_events(category, days, region=region) for category, days, region in from_store))
+        results = dict(zip(from_store, answers))
+        
+        upstream = [intent for intent in unique if intent not in results]
+        if not upstream:
+            return results
+        superset = await self._get_cached_events(None, max(days for _, days, _ in upstream), "open")
+        timestamps = {event.id: latest_geometry_timestamp(event) for event in superset}
+        now = time.time()
+        for category, days, region in upstream:
+            since = now - days * 86400
+            events = [event for event in superset if timestamps[event.id] >= since]
+            if category and category.lower() in self.category_mapping:
+                events = self._filter_events_by_category(events, category.lower())
+            results[(category, days, region)] = region_classifier.filter(events, region)
+        logger.info("Answered %d intents from one EONET fetch of %d events", len(upstream), len(superset))
+        return results
+    
+    async def _get_cached_events(self, category: str, days: int, status: str) -> List[Event]:
+        """Per-key cached upstream lookup used before the snapshot loads and for non-open statuses"""
         cache_key = f"{category}_{days}_{status}"
         
-        if cache_key in self.cache:
-            logger.info("Returning cached EONET data")
-            return self.cache[cache_key]
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Returning cached EONET data")
+            # Refresh shortly before expiry so hot keys never go cold
+            if time.monotonic() >= self._refresh_at.get(cache_key, float("inf")):
+                self._schedule_refresh(cache_key, category, days, status)
+            return cached
             
         try:
-            async with httpx.AsyncClient() as client:
-                params = {
-                    "status": status,
-                    "days": days
-                }
-                if category:
-                    # Map category name to EONET category ID
-                    category_id = self.category_mapping.get(category.lower())
-                    if category_id:
-                        params["category"] = category_id
-                        logger.info(f"Mapped category '{category}' to EONET ID {category_id}")
-                    else:
-                        logger.warning(f"Unknown category '{category}', fetching all events")
-                if self.api_key:
-                    params["api_key"] = self.api_key
-                    
-                response = await client.get(f"{self.base_url}/events", params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                events = data.get("events", [])
-                
-                # Filter events by category if specific category was requested
-                if category and category.lower() in self.category_mapping:
-                    filtered_events = self._filter_events_by_category(events, category.lower())
-                    logger.info(f"Filtered {len(events)} events to {len(filtered_events)} {category} events")
-                    events = filtered_events
-                
-                # Cache the results
-                self.cache[cache_key] = events
-                logger.info(f"Fetched {len(events)} events from EONET API")
-                
-                return events
-                
+            # Concurrent misses on the same key share one upstream request
+            return await self.single_flight.do(cache_key, lambda: self._load_events(cache_key, category, days, status))
         except httpx.HTTPError as e:
             logger.error(f"Error fetching EONET data: {e}")
-            return []
+            return self._fallback(cache_key)
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
+            return self._fallback(cache_key)
+    
+    def _fallback(self, cache_key: str) -> List[Event]:
+        """Serve the last successful result for a key after an upstream failure"""
+        events = self._last_good.get(cache_key)
+        if events is None:
             return []
+        self.upstream.record_fallback()
+        logger.warning(f"Serving last known EONET data for '{cache_key}' after upstream failure")
+        return events
+    
+    async def _load_events(self, cache_key: str, category: str, days: int, status: str) -> List[Event]:
+        """Fetch events for one cache key from the upstream and cache them"""
+        params = {
+            "status": status,
+            "days": days
+        }
+        if category:
+            # Map category name to EONET category ID
+            category_id = self.category_mapping.get(category.lower())
+            if category_id:
+                params["category"] = category_id
+                logger.debug("Mapped category '%s' to EONET ID %s", category, category_id)
+            else:
+                logger.warning(f"Unknown category '{category}', fetching all events")
+            
+        events = await self._fetch_events(params, hedge=True)
+        
+        # Filter events by category if specific category was requested
+        if category and category.lower() in self.category_mapping:
+            filtered_events = self._filter_events_by_category(events, category.lower())
+            logger.debug("Filtered %d events to %d %s events", len(events), len(filtered_events), category)
+            events = filtered_events
+        
+        # Cache the results and pick a jittered early-refresh point before expiry
+        await self.cache.set(cache_key, events, CACHE_TTL)
+        self._last_good[cache_key] = events
+        self._refresh_at[cache_key] = time.monotonic() + CACHE_TTL * random.uniform(1 - 2 * EARLY_REFRESH_FRACTION, 1 - EARLY_REFRESH_FRACTION)
+        logger.info("Fetched %d events from EONET API", len(events))
+        
+        return events
+    
+    def _schedule_refresh(self, cache_key: str, category: str, days: int, status: str) -> None:
+        """Refresh a cache key in the background unless a fetch is already in flight"""
+        if self.single_flight.in_flight(cache_key):
+            return
+        self._refresh_at.pop(cache_key, None)
+        self.early_refreshes += 1
+        
+        async def refresh() -> None:
+            try:
+                await self.single_flight.do(cache_key, lambda: self._load_events(cache_key, category, days, status))
+            except Exception as e:
+                logger.warning(f"Early refresh of EONET cache key '{cache_key}' failed: {e}")
+        
+        asyncio.create_task(refresh())
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Per-key cache and request coalescing counters"""
+        return {
+            **self.cache.stats(),
+            "early_refreshes": self.early_refreshes,
+            **self.single_flight.stats(),
+            "store": self.store.stats(),
+            "event_pool": event_pool.stats(),
+        }
     
-    def _filter_events_by_category(self, events: List[Dict[str, Any]], category: str) -> List[Dict[str, Any]]:
+    def _filter_events_by_category(self, events: List[Event], category: str) -> List[Event]:
         """
         Filter events to only include those matching the specified category
         """
@@ -94,9 +335,8 @@ class EONETService:
             
         filtered_events = []
         for event in events:
-            event_categories = event.get("categories", [])
-            for cat in event_categories:
-                if cat.get("id") == category_id:
+            for cat in event.categories:
+                if cat.id == category_id:
                     filtered_events.append(event)
                     break
                     
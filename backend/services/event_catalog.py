@@ -0,0 +1,170 @@
+import bisect
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+from models.schemas import Event
+
+def latest_geometry_timestamp(event: Event) -> float:
+    """Return the most recent geometry date of an event as a UNIX timestamp (0 if unknown)"""
+    latest = 0.0
+    for geom in event.geometries:
+        date = geom.date
+        if not date:
+            continue
+        try:
+            parsed = datetime.fromisoformat(date.replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        latest = max(latest, parsed.timestamp())
+    return latest
+
+
+def iter_points(coordinates: Any) -> Iterator[Tuple[float, float]]:
+    """Yield (lon, lat) pairs from Point, LineString or Polygon coordinate arrays"""
+    if not isinstance(coordinates, list) or not coordinates:
+        return
+    if isinstance(coordinates[0], (int, float)):
+        if len(coordinates) >= 2:
+            yield float(coordinates[0]), float(coordinates[1])
+        return
+    for item in coordinates:
+        yield from iter_points(item)
+
+
+def event_points(event: Event) -> List[Tuple[float, float]]:
+    """All (lon, lat) points across an event's geometries"""
+    points = []
+    for geom in event.geometries:
+        points.extend(iter_points(geom.coordinates))
+    return points
+
+
+class EventCatalog:
+    """
+    Immutable, indexed view over an EONET event list.
+
+    Maintains inverted indexes by category id and region and a sorted index by
+    latest geometry date so that category, region and time window queries only
+    touch candidate events instead of scanning the full list. Per-event timestamps
+    and regions are kept so `apply` can derive the next catalog from a delta without
+    recomputing them for unchanged events.
+    """
+
+    def __init__(
+        self,
+        events: List[Event],
+        classifier: Optional[Any] = None,
+        timestamps: Optional[List[float]] = None,
+        regions: Optional[List[FrozenSet[str]]] = None,
+    ) -> None:
+        self.events = events
+        if timestamps is None:
+            timestamps = [latest_geometry_timestamp(event) for event in events]
+        if regions is None:
+            regions = classifier.classify(events) if classifier is not None else [frozenset()] * len(events)
+        self.timestamps = timestamps
+        self.regions = regions
+
+        self._by_id: Dict[str, int] = {event.id: position for position, event in enumerate(events)}
+
+        # Category id -> positions
+        self._by_category: Dict[int, Set[int]] = defaultdict(set)
+        for position, event in enumerate(events):
+            for cat in event.categories:
+                self._by_category[cat.id].add(position)
+
+        # Region name -> positions, classified once per event
+        self._by_region: Dict[str, Set[int]] = defaultdict(set)
+        for position, event_regions in enumerate(regions):
+            for region in event_regions:
+                self._by_region[region].add(position)
+
+        # Positions ordered by latest geometry date, with parallel sorted timestamps for bisect
+        self._by_date = sorted(range(len(events)), key=self.timestamps.__getitem__)
+        self._sorted_timestamps = [self.timestamps[position] for position in self._by_date]
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def apply(
+        self,
+        added: List[Event],
+        replaced: Dict[str, Event],
+        removed: Set[str],
+        classifier: Optional[Any] = None,
+    ) -> "EventCatalog":
+        """
+        Return a new catalog with a delta applied. Added events go first; only added
+        and replaced events are dated and classified, the rest keep their derived data.
+        """
+        changed = added + list(replaced.values())
+        changed_timestamps = [latest_geometry_timestamp(event) for event in changed]
+        if classifier is not None:
+            changed_regions = classifier.classify(changed)
+        else:
+            changed_regions = [frozenset()] * len(changed)
+
+        events = list(added)
+        timestamps = changed_timestamps[:len(added)]
+        regions = changed_regions[:len(added)]
+        derived = {
+            event.id: (timestamp, event_regions)
+            for event, timestamp, event_regions in zip(changed, changed_timestamps, changed_regions)
+        }
+        for position, event in enumerate(self.events):
+            if event.id in removed:
+                continue
+            if event.id in replaced:
+                events.append(replaced[event.id])
+                timestamp, event_regions = derived[event.id]
+                timestamps.append(timestamp)
+                regions.append(event_regions)
+            else:
+                events.append(event)
+                timestamps.append(self.timestamps[position])
+                regions.append(self.regions[position])
+        return EventCatalog(events, timestamps=timestamps, regions=regions)
+
+    def get(self, event_id: str) -> Optional[Event]:
+        position = self._by_id.get(event_id)
+        return self.events[position] if position is not None else None
+
+    def _since(self, timestamp: float) -> Set[int]:
+        index = bisect.bisect_left(self._sorted_timestamps, timestamp)
+        return set(self._by_date[index:])
+
+    def positions(
+        self,
+        since: Optional[float] = None,
+        category_id: Optional[int] = None,
+        region: Optional[str] = None,
+    ) -> List[int]:
+        """Positions of events matching every given filter, in original list order"""
+        candidate_sets: List[Set[int]] = []
+        if category_id is not None:
+            candidate_sets.append(self._by_category.get(category_id, set()))
+        if since is not None:
+            candidate_sets.append(self._since(since))
+        if region is not None:
+            candidate_sets.append(self._by_region.get(region.lower(), set()))
+
+        if not candidate_sets:
+            return list(range(len(self.events)))
+
+        candidate_sets.sort(key=len)
+        matches = set(candidate_sets[0])
+        for other in candidate_sets[1:]:
+            matches &= other
+        return sorted(matches)
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        category_id: Optional[int] = None,
+        region: Optional[str] = None,
+    ) -> List[Event]:
+        """Events matching every given filter, in original list order"""
+        return [self.events[position] for position in self.positions(since, category_id, region)]
+
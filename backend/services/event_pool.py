@@ -0,0 +1,63 @@
+import sys
+import weakref
+from typing import Dict, Tuple
+from models.schemas import Event, EventCategory
+
+
+class EventPool:
+    """
+    Canonical Event instances shared by everything that holds parsed events.
+
+    The snapshot, the cached delta and per-key upstream responses, the
+    last-good fallbacks and lists decoded from a shared cache are each parsed
+    separately. Interning looks each parsed event up by id; if the pooled copy
+    is equal in every field that instance is returned and the new one is
+    dropped, so an event held in several places is one object. A copy that
+    differs in any field replaces the pooled one. New events have their
+    categories replaced by shared instances and repeated strings interned.
+
+    This deduplicates, it does not compact: steady-state memory is the
+    snapshot's own events, which are held once either way. The pool only
+    references events weakly, so it keeps nothing alive that no cache or
+    snapshot still holds.
+    """
+
+    def __init__(self) -> None:
+        self._events: "weakref.WeakValueDictionary[str, Event]" = weakref.WeakValueDictionary()
+        self._categories: Dict[Tuple[int, str], EventCategory] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _category(self, category: EventCategory) -> EventCategory:
+        key = (category.id, category.title)
+        shared = self._categories.get(key)
+        if shared is None:
+            category.title = sys.intern(category.title)
+            shared = self._categories[key] = category
+        return shared
+
+    def intern(self, event: Event) -> Event:
+        pooled = self._events.get(event.id)
+        # Model equality compares every field, including nested geometries and sources
+        if pooled is not None and pooled == event:
+            self.hits += 1
+            return pooled
+        self.misses += 1
+
+        event.categories = [self._category(cat) for cat in event.categories]
+        for geom in event.geometries:
+            geom.type = sys.intern(geom.type)
+        for source in event.sources:
+            source.id = sys.intern(source.id)
+        self._events[event.id] = event
+        return event
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._events),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+event_pool = EventPool()
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from models.schemas import Event
+from services.event_catalog import EventCatalog
+from services.event_pool import event_pool
+from services.regions import region_classifier
+from services.snapshot_file import SnapshotFile
+
+logger = logging.getLogger(__name__)
+
+# Delay before retrying when a refresh fails and the snapshot is stale
+RETRY_DELAY = 30
+
+# Extra look-back added to each delta query so changes near the boundary are not missed
+DELTA_MARGIN_DAYS = 1
+
+
+class EventStore:
+    """
+    In-memory snapshot of open EONET events refreshed by a background task.
+
+    The full open-event set for the maximum `days` window is pulled once per
+    refresh interval and every query is answered locally. When the snapshot is
+    older than the refresh interval it is still served while a refresh runs in
+    the background (stale-while-revalidate). If a snapshot file is configured,
+    each refresh is persisted and restored on startup as last-known-good data.
+
+    When `fetch_delta` is given, refreshes between full syncs only request the
+    events opened, updated or closed since the last sync and merge the ones
+    that differ from the snapshot copy. A full sync still runs every
+    `full_sync_interval` to drop events that aged out of the window or
+    vanished upstream.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[int], Awaitable[List[Event]]],
+        window_days: int = 365,
+        refresh_interval: float = 300,
+        snapshot_file: Optional[SnapshotFile] = None,
+        fetch_delta: Optional[Callable[[int], Awaitable[Tuple[List[Event], List[Event]]]]] = None,
+        full_sync_interval: float = 3600,
+    ) -> None:
+        self._fetch = fetch
+        self._fetch_delta = fetch_delta
+        self.full_sync_interval = full_sync_interval
+        self.window_days = window_days
+        self.refresh_interval = refresh_interval
+        self.snapshot_file = snapshot_file
+        self.catalog = EventCatalog([])
+        self.updated_at: Optional[float] = None
+        self.version = 0
+        self.synced_at: Optional[float] = None
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.delta_changes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def events(self) -> List[Event]:
+        return self.catalog.events
+
+    @property
+    def ready(self) -> bool:
+        return self.updated_at is not None
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful refresh"""
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    @property
+    def is_stale(self) -> bool:
+        return self.ready and self.age >= self.refresh_interval
+
+    def load(self, events: List[Event], age: float = 0.0) -> None:
+        """Replace the snapshot with a complete event list fetched `age` seconds ago"""
+        self.catalog = EventCatalog(events, region_classifier)
+        self.updated_at = time.monotonic() - age
+        self.synced_at = self.updated_at
+        self.version += 1
+
+    def merge(self, updated: List[Event], closed: List[Event]) -> int:
+        """
+        Apply a delta to the snapshot: upsert new or changed open events and drop
+        closed ones. Returns the number of events that changed; a new catalog is only
+        derived (and the version bumped) when something did.
+        """
+        closed = list(closed)
+        upserts: Dict[str, Event] = {}
+        for event in updated:
+            if event.closed:
+                closed.append(event)
+                continue
+            current = upserts.get(event.id) or self.catalog.get(event.id)
+            # The pool returns the snapshot's own instance for an unchanged event;
+            # equality compares every field, so description or source edits count too
+            if current is not None and (current is event or current == event):
+                continue
+            upserts[event.id] = event
+        removed = set()
+        for event in closed:
+            upserts.pop(event.id, None)
+            if self.catalog.get(event.id) is not None:
+                removed.add(event.id)
+        # New events go first, matching EONET's most-recent-first ordering
+        added = [event for event in upserts.values() if self.catalog.get(event.id) is None]
+        replaced = {event.id: event for event in upserts.values() if self.catalog.get(event.id) is not None}
+
+        self.updated_at = time.monotonic()
+        changes = len(replaced) + len(added) + len(removed)
+        if changes:
+            self.catalog = self.catalog.apply(added, replaced, removed, region_classifier)
+            self.version += 1
+        return changes
+
+    def _delta_days(self) -> Optional[int]:
+        """Look-back for the next delta query, or None when a full sync is due"""
+        if self._fetch_delta is None or self.synced_at is None:
+            return None
+        if time.monotonic() - self.synced_at >= self.full_sync_interval:
+            return None
+        days = math.ceil(self.age / 86400) + DELTA_MARGIN_DAYS
+        return days if days < self.window_days else None
+
+    async def restore(self) -> bool:
+        """Load the persisted snapshot, if any, so queries can be served before the first refresh"""
+        if self.snapshot_file is None:
+            return False
+        contents = await self.snapshot_file.load()
+        if contents is None or contents.window_days < self.window_days:
+            return False
+        events = [event_pool.intern(event) for event in contents.events]
+        self.load(events, age=max(0.0, time.time() - contents.saved_at))
+        return True
+
+    async def refresh(self) -> bool:
+        """Sync the snapshot, incrementally when possible; keeps the previous snapshot on failure"""
+        days = self._delta_days()
+        try:
+            if days is None:
+                events = await self._fetch(self.window_days)
+            else:
+                updated, closed = await self._fetch_delta(days)
+        except Exception as e:
+            logger.error(f"EONET event store refresh failed: {e}")
+            return False
+
+        if days is None:
+            self.load(events)
+            self.full_syncs += 1
+            logger.info(f"EONET event store refreshed with {len(events)} events (version {self.version})")
+        else:
+            changes = self.merge(updated, closed)
+            self.delta_syncs += 1
+            self.delta_changes += changes
+            logger.info(
+                f"EONET event store merged {len(updated)} updated and {len(closed)} closed events "
+                f"from the past {days} days, {changes} changed (version {self.version})"
+            )
+            if not changes:
+                return True
+        if self.snapshot_file is not None:
+            await self.snapshot_file.save(self.events, self.window_days)
+        return True
+
+    def trigger_refresh(self) -> "asyncio.Task[bool]":
+        """Start a background refresh unless one is already running, and return the running one"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+        return self._refresh_task
+
+    async def _run(self) -> None:
+        while True:
+            # A fresh restored snapshot is kept until it reaches the refresh interval
+            if not self.ready or self.is_stale:
+                # Joins a refresh a stale query already started instead of fetching again
+                await self.trigger_refresh()
+            remaining = self.refresh_interval - self.age if self.ready else 0
+            await asyncio.sleep(max(remaining, 0) or RETRY_DELAY)
+
+    def start(self) -> None:
+        """Start the periodic background ingestion task"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._refresh_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "events": len(self.catalog),
+            "version": self.version,
+            "age": self.age,
+            "full_syncs": self.full_syncs,
+            "delta_syncs": self.delta_syncs,
+            "delta_changes": self.delta_changes,
+        }
+
+    def query(
+        self,
+        days: int,
+        category_id: Optional[int] = None,
+        region: Optional[str] = None,
+    ) -> List[Event]:
+        """Return snapshot events active within the past `days`, optionally by category and region"""
+        if self.is_stale:
+            self.trigger_refresh()
+
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).timestamp()
+        if not region_classifier.is_region(region):
+            region = None
+        return self.catalog.query(since=since, category_id=category_id, region=region)
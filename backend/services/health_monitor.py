@@ -0,0 +1,124 @@
+import asyncio
+import bisect
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the probe latency histogram buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with cumulative counts, as Prometheus reports them"""
+
+    def __init__(self, buckets: List[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = {}
+        running = 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            running += count
+            cumulative[bound] = running
+        return {"buckets": cumulative, "count": self.count, "sum": round(self.sum, 4)}
+
+
+class DependencyProbe:
+    """A dependency check run on its own schedule; the latest result is cached"""
+
+    def __init__(self, name: str, check: Callable[[], Awaitable[bool]], interval: float) -> None:
+        self.name = name
+        self._check = check
+        self.interval = interval
+        self.healthy: Optional[bool] = None
+        self.latency: Optional[float] = None
+        self.checked_at: Optional[str] = None
+        self.histogram = LatencyHistogram()
+        self._lock = asyncio.Lock()
+
+    async def _probe(self) -> None:
+        started = time.monotonic()
+        try:
+            healthy = bool(await self._check())
+        except Exception as e:
+            logger.warning(f"Health probe for {self.name} failed: {e}")
+            healthy = False
+        self.latency = time.monotonic() - started
+        self.histogram.observe(self.latency)
+        self.healthy = healthy
+        self.checked_at = datetime.utcnow().isoformat()
+
+    async def run(self) -> bool:
+        async with self._lock:
+            await self._probe()
+        return self.healthy
+
+    async def latest(self) -> bool:
+        """Cached result; only callers arriving before the first probe completes wait for it"""
+        if self.healthy is None:
+            async with self._lock:
+                if self.healthy is None:
+                    await self._probe()
+        return self.healthy
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "checked_at": self.checked_at,
+            "latency": round(self.latency, 4) if self.latency is not None else None,
+            "interval": self.interval,
+            "latency_histogram": self.histogram.snapshot(),
+        }
+
+
+class HealthMonitor:
+    """
+    Runs dependency probes in the background so health endpoints never call
+    upstreams themselves; polling them costs no upstream traffic.
+    """
+
+    def __init__(self) -> None:
+        self.probes: Dict[str, DependencyProbe] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, name: str, check: Callable[[], Awaitable[bool]], interval: float) -> None:
+        self.probes[name] = DependencyProbe(name, check, interval)
+
+    async def _run(self, probe: DependencyProbe) -> None:
+        while True:
+            await probe.run()
+            await asyncio.sleep(probe.interval)
+
+    def start(self) -> None:
+        """Start one background task per probe"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run(probe)) for probe in self.probes.values()]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def results(self) -> Dict[str, bool]:
+        names = list(self.probes)
+        healthy = await asyncio.gather(*(self.probes[name].latest() for name in names))
+        return dict(zip(names, healthy))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: probe.stats() for name, probe in self.probes.items()}
@@ -0,0 +1,123 @@
+import httpx
+import importlib.util
+import logging
+import time
+from typing import Dict, Any
+from config import settings
+from services.metrics import UPSTREAM_LATENCY, UPSTREAM_PAYLOAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional `h2` package (installed via httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientRegistry:
+    """
+    Application-wide registry of pooled httpx clients, one per upstream.
+
+    Clients are created on startup and closed on shutdown so connections
+    (DNS, TCP and TLS setup) are reused across requests instead of being
+    paid on every call.
+    """
+
+    def __init__(self) -> None:
+        self._upstreams: Dict[str, Dict[str, Any]] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._request_counts: Dict[str, int] = {}
+        self.http2 = settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    def register(self, name: str, base_url: str, timeout: float) -> None:
+        """Register an upstream so a pooled client can be built for it"""
+        self._upstreams[name] = {"base_url": base_url, "timeout": timeout}
+        self._request_counts.setdefault(name, 0)
+
+    def _create_client(self, name: str) -> httpx.AsyncClient:
+        upstream = self._upstreams[name]
+
+        async def count_request(request: httpx.Request) -> None:
+            self._request_counts[name] += 1
+            request.extensions["terrachat_started"] = time.perf_counter()
+
+        async def observe_response(response: httpx.Response) -> None:
+            started = response.request.extensions.get("terrachat_started")
+            # Streamed requests (marked "terrachat_stream") are timed to the response headers
+            # and their body is left unread; for the rest, reading it here costs nothing extra
+            streamed = response.request.extensions.get("terrachat_stream", False)
+            if not streamed:
+                await response.aread()
+            if started is not None:
+                UPSTREAM_LATENCY.labels(name, str(response.status_code)).observe(time.perf_counter() - started)
+            if not streamed:
+                UPSTREAM_PAYLOAD_BYTES.labels(name).observe(len(response.content))
+
+        return httpx.AsyncClient(
+            base_url=upstream["base_url"],
+            timeout=httpx.Timeout(upstream["timeout"]),
+            limits=self.limits,
+            http2=self.http2,
+            event_hooks={"request": [count_request], "response": [observe_response]},
+        )
+
+    async def start(self) -> None:
+        """Create a client for every registered upstream"""
+        for name in self._upstreams:
+            if name not in self._clients:
+                self._clients[name] = self._create_client(name)
+        logger.info(f"HTTP client pool started for {', '.join(self._clients)} (http2={self.http2})")
+
+    async def close(self) -> None:
+        """Close all clients and release their pooled connections"""
+        for client in list(self._clients.values()):
+            await client.aclose()
+        self._clients.clear()
+        logger.info("HTTP client pool closed")
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """
+        Return the pooled client for an upstream.
+        Creates it lazily if used outside the application lifespan (e.g. scripts).
+        """
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            if name not in self._upstreams:
+                raise KeyError(f"Unknown upstream '{name}'")
+            client = self._create_client(name)
+            self._clients[name] = client
+        return client
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool utilization per upstream"""
+        stats = {}
+        for name, upstream in self._upstreams.items():
+            client = self._clients.get(name)
+            active = idle = 0
+            if client is not None and not client.is_closed:
+                # httpcore does not expose pool metrics publicly, so inspect defensively
+                pool = getattr(getattr(client, "_transport", None), "_pool", None)
+                for connection in getattr(pool, "connections", []):
+                    if connection.is_idle():
+                        idle += 1
+                    else:
+                        active += 1
+            stats[name] = {
+                "open": client is not None and not client.is_closed,
+                "active_connections": active,
+                "idle_connections": idle,
+                "max_connections": self.limits.max_connections,
+                "utilization": round(active / self.limits.max_connections, 3) if self.limits.max_connections else 0.0,
+                "requests": self._request_counts.get(name, 0),
+                "timeout": upstream["timeout"],
+                "http2": self.http2,
+            }
+        return stats
+
+
+http_clients = HTTPClientRegistry()
+http_clients.register("eonet", settings.EONET_BASE_URL, settings.EONET_TIMEOUT)
+http_clients.register("openrouter", settings.OPENROUTER_BASE_URL, settings.OPENROUTER_TIMEOUT)
@@ -0,0 +1,109 @@
+import re
+from typing import Dict, List, NamedTuple, Set, Tuple
+from services.cache_backend import CountingLRUCache
+from services.categories import CATEGORY_SYNONYMS
+from services.regions import REGION_SYNONYMS
+
+# Time expressions recognised in messages. Plural "past/last" forms are listed
+# so they are matched as one phrase rather than as "past" + "weeks".
+TIME_TERMS = [
+    "past week", "last week", "past weeks", "last weeks",
+    "past month", "last month", "past months", "last months",
+    "past year", "last year", "past years", "last years",
+    "today", "yesterday",
+    "week", "weeks", "month", "months", "year", "years",
+    "past", "last",
+]
+
+DEFAULT_DAYS = 7
+
+
+class Intent(NamedTuple):
+    category: str
+    days: int
+    region: str
+
+
+def _days_for(tokens: Set[str]) -> int:
+    """Resolve the time window from the time expressions found in a message"""
+    if tokens & {"past week", "last week", "past weeks", "last weeks"}:
+        return 7
+    if tokens & {"past month", "last month", "past months", "last months"}:
+        return 30
+    if tokens & {"past year", "last year", "past years", "last years"}:
+        return 365
+    if "today" in tokens:
+        return 1
+    if "yesterday" in tokens:
+        return 2
+    # A bare unit only counts when it is not qualified by "past"/"last" elsewhere
+    if not tokens & {"past", "last"}:
+        if tokens & {"week", "weeks"}:
+            return 7
+        if tokens & {"month", "months"}:
+            return 30
+        if tokens & {"year", "years"}:
+            return 365
+    return DEFAULT_DAYS
+
+
+class IntentMatcher:
+    """
+    Extracts category, time window and region from a message in a single regex pass.
+
+    All category, region and time phrases are compiled once into one
+    word-bounded alternation; results are memoized per normalized message
+    in a bounded LRU cache.
+    """
+
+    def __init__(self, cache_size: int = 1024) -> None:
+        terms: List[Tuple[str, str, str, int]] = []
+        for priority, (category, synonyms) in enumerate(CATEGORY_SYNONYMS.items()):
+            terms.extend((synonym, "category", category, priority) for synonym in synonyms)
+        for priority, (region, synonyms) in enumerate(REGION_SYNONYMS.items()):
+            terms.extend((synonym, "region", region, priority) for synonym in synonyms)
+        terms.extend((term, "time", term, 0) for term in TIME_TERMS)
+
+        # Longest phrases first so multi-word terms win over their parts
+        terms.sort(key=lambda term: len(term[0]), reverse=True)
+        self._terms = terms
+        alternatives = "|".join(f"(?P<t{index}>{re.escape(term[0])})" for index, term in enumerate(terms))
+        self._pattern = re.compile(rf"\b(?:{alternatives})\b")
+        self._cache = CountingLRUCache(maxsize=cache_size)
+        self.hits = 0
+        self.misses = 0
+
+    def match(self, message: str) -> Intent:
+        key = " ".join(message.lower().split())
+        intent = self._cache.get(key)
+        if intent is not None:
+            self.hits += 1
+            return intent
+        self.misses += 1
+
+        category: Tuple[int, str] = (len(CATEGORY_SYNONYMS), "all")
+        region: Tuple[int, str] = (len(REGION_SYNONYMS), "all")
+        time_tokens: Set[str] = set()
+        for match in self._pattern.finditer(key):
+            _, kind, value, priority = self._terms[int(match.lastgroup[1:])]
+            if kind == "category":
+                category = min(category, (priority, value))
+            elif kind == "region":
+                region = min(region, (priority, value))
+            else:
+                time_tokens.add(value)
+
+        intent = Intent(category[1], _days_for(time_tokens), region[1])
+        self._cache[key] = intent
+        return intent
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cached_messages": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self._cache.evictions,
+        }
+
+
+intent_matcher = IntentMatcher()
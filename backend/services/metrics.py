@@ -0,0 +1,104 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Buckets (seconds) shared by request, stage and upstream latency histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Buckets (bytes) for upstream response payload sizes
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 20_000_000)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+REQUEST_LATENCY = Histogram(
+    "terrachat_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+CHAT_STAGE_LATENCY = Histogram(
+    "terrachat_chat_stage_duration_seconds",
+    "Time spent in each stage of the chat pipeline",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_LATENCY = Histogram(
+    "terrachat_upstream_request_duration_seconds",
+    "Upstream HTTP call latency, including reading the body",
+    ["upstream", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_PAYLOAD_BYTES = Histogram(
+    "terrachat_upstream_response_bytes",
+    "Upstream HTTP response body size",
+    ["upstream"],
+    buckets=SIZE_BUCKETS,
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "terrachat_rate_limit_rejections_total",
+    "Requests rejected by the rate limiter",
+    ["route"],
+)
+
+
+@contextmanager
+def chat_stage(stage: str) -> Iterator[None]:
+    """Time one stage of the chat pipeline"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        CHAT_STAGE_LATENCY.labels(stage).observe(time.perf_counter() - started)
+
+
+class StatsCollector:
+    """
+    Exposes the counters services already keep (cache and upstream-policy stats)
+    at scrape time, instead of mirroring every increment into Prometheus objects.
+    """
+
+    def __init__(self) -> None:
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._upstreams: Callable[[], Dict[str, Dict[str, Any]]] = dict
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        self._caches[name] = stats
+
+    def register_upstreams(self, stats: Callable[[], Dict[str, Dict[str, Any]]]) -> None:
+        self._upstreams = stats
+
+    def collect(self):
+        hits = CounterMetricFamily("terrachat_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("terrachat_cache_misses", "Cache misses", labels=["cache"])
+        evictions = CounterMetricFamily("terrachat_cache_evictions", "Entries evicted to stay within capacity", labels=["cache"])
+        entries = GaugeMetricFamily("terrachat_cache_entries", "Entries currently cached", labels=["cache"])
+        for name, stats in self._caches.items():
+            values = stats()
+            hits.add_metric([name], values.get("hits", 0))
+            misses.add_metric([name], values.get("misses", 0))
+            if "evictions" in values:
+                evictions.add_metric([name], values["evictions"])
+            if "entries" in values:
+                entries.add_metric([name], values["entries"])
+        yield from (hits, misses, evictions, entries)
+
+        circuit_open = GaugeMetricFamily("terrachat_upstream_circuit_open", "1 while the upstream circuit breaker is not closed", labels=["upstream"])
+        counters = {
+            key: CounterMetricFamily(f"terrachat_upstream_{key}", f"Upstream policy {key.replace('_', ' ')}", labels=["upstream"])
+            for key in ("calls", "failures", "short_circuits", "retries", "retries_denied", "hedges", "hedge_wins", "fallbacks")
+        }
+        for name, values in self._upstreams().items():
+            circuit_open.add_metric([name], 0 if values["circuit"] == "closed" else 1)
+            for key, family in counters.items():
+                family.add_metric([name], values[key])
+        yield circuit_open
+        yield from counters.values()
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
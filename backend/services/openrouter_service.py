@@ -1,46 +1,65 @@
+import asyncio
+import hashlib
 import httpx
 import os
 import json
 import logging
-from typing import Dict, Any, Tuple, List
+from cachetools import TTLCache
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, Any, Tuple, List, Optional, AsyncIterator
+from config import settings
+from models.schemas import Event
+from services.http_client import http_clients
+from services.intent_matcher import intent_matcher
+from services.resilience import upstream_policies
 
 logger = logging.getLogger(__name__)
 
+# Events summarized in the completion prompt; the rest are only counted
+PROMPT_EVENT_LIMIT = 20
+
+SYSTEM_PROMPT = (
+    "You are TerraChat, an assistant for NASA EONET natural event data. "
+    "Answer in two or three friendly sentences using only the events listed. "
+    "Mention counts and notable events; the user sees full event cards below your answer."
+)
+
+
+def events_digest(events: List[Event]) -> str:
+    """Short hash identifying an event list by ids and geometry counts"""
+    digest = hashlib.blake2b(digest_size=12)
+    for event in events:
+        digest.update(f"{event.id}:{len(event.geometries)};".encode())
+    return digest.hexdigest()
+
 class OpenRouterService:
     def __init__(self) -> None:
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         if not self.api_key:
             logger.warning("OPENROUTER_API_KEY not found in environment variables")
-        self.base_url = "https://openrouter.ai/api/v1"
-        
-        # Category mapping for consistent detection
-        self.category_mapping = {
-            "wildfire": "wildfires",
-            "volcano": "volcanoes", 
-            "flood": "floods",
-            "storm": "storms",
-            "earthquake": "earthquakes",
-            "drought": "drought",
-            "droughts": "drought",  # Handle both singular and plural
-            "landslide": "landslides",
-            "snow": "snow",
-            "ice": "ice",
-            "dust": "dust",
-            "manmade": "manmade",
-            "man-made": "manmade"
+        self.base_url = settings.OPENROUTER_BASE_URL
+        # Circuit breaker and retries shared by every OpenRouter call
+        self.upstream = upstream_policies.get("openrouter")
+        
+        # LLM generation: bounded concurrency and a result cache keyed on (category, events digest)
+        self._semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self._completions = TTLCache(maxsize=settings.LLM_CACHE_SIZE, ttl=settings.LLM_CACHE_TTL)
+        self.llm_stats = {
+            "completions": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "fallback_saturated": 0,
+            "fallback_timeout": 0,
+            "fallback_error": 0,
         }
         
+        self.matcher = intent_matcher
+        
     def _detect_category(self, message: str) -> str:
         """
-        Detect category from message using the category mapping
+        Detect category from message using the compiled intent matcher
         """
-        message_lower = message.lower()
-        
-        for keyword, category in self.category_mapping.items():
-            if keyword in message_lower:
-                return category
-                
-        return "all"
+        return self.matcher.match(message).category
         
     async def extract_intent(self, message: str) -> Tuple[str, int, str]:
         """
@@ -48,54 +67,195 @@ class OpenRouterService:
         Returns: (category, days, region)
         """
         # Use local pattern matching instead of external API
-        message_lower = message.lower()
-        
-        # Extract category
-        category = self._detect_category(message)
-        
-        # Extract days
-        days = 7  # Default to 7 days for recent focus
-        if "past week" in message_lower or "last week" in message_lower:
-            days = 7
-        elif "past month" in message_lower or "last month" in message_lower:
-            days = 30
-        elif "past year" in message_lower or "last year" in message_lower:
-            days = 365
-        elif "today" in message_lower:
-            days = 1
-        elif "yesterday" in message_lower:
-            days = 2
-        elif "week" in message_lower and "past" not in message_lower and "last" not in message_lower:
-            days = 7
-        elif "month" in message_lower and "past" not in message_lower and "last" not in message_lower:
-            days = 30
-        elif "year" in message_lower and "past" not in message_lower and "last" not in message_lower:
-            days = 365
-        
-        # Extract region (simplified)
-        region = "all"
-        if "north america" in message_lower or "usa" in message_lower or "united states" in message_lower:
-            region = "north america"
-        elif "europe" in message_lower:
-            region = "europe"
-        elif "asia" in message_lower:
-            region = "asia"
-        elif "africa" in message_lower:
-            region = "africa"
-        elif "oceania" in message_lower or "australia" in message_lower:
-            region = "oceania"
-        elif "south america" in message_lower:
-            region = "south america"
-        
-        logger.info(f"Extracted intent: category={category}, days={days}, region={region}")
+        category, days, region = self.matcher.match(message)
+        
+        logger.debug("Extracted intent: category=%s, days=%s, region=%s", category, days, region)
         return category, days, region
             
-    async def generate_response(self, message: str, events: List[Dict[str, Any]]) -> str:
+    async def generate(self, message: str, events: List[Event], category: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Generate the response text and whether it may be cached with the events.
+        With LLM generation enabled the answer comes from OpenRouter when it can be
+        produced within the latency budget; otherwise the template path is used and
+        the flag is False, so a fallback is not kept in place of a model answer.
+        """
+        if category is None:
+            category = self._detect_category(message)
+        if not self._use_llm(events, category):
+            return self._template_response(events, category), True
+        
+        key = (category, events_digest(events))
+        cached = self._completions.get(key)
+        if cached is not None:
+            self.llm_stats["cache_hits"] += 1
+            return cached, True
+        self.llm_stats["cache_misses"] += 1
+        if self._semaphore.locked():
+            return self._fallback("saturated", events, category), False
+        
+        async with self._semaphore:
+            try:
+                text = await asyncio.wait_for(self._complete(message, events, category), settings.LLM_LATENCY_BUDGET)
+            except asyncio.TimeoutError:
+                return self._fallback("timeout", events, category), False
+            except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+                logger.warning(f"OpenRouter completion failed: {e}")
+                return self._fallback("error", events, category), False
+        self._completions[key] = text
+        return text, True
+        
+    async def stream_response(self, message: str, events: List[Event], category: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield the response text in chunks as OpenRouter produces tokens.
+        Cached, templated and fallback responses are yielded as a single chunk. The
+        latency budget covers opening the stream and the first token; once streaming
+        has started the answer is completed rather than replaced.
+        """
+        if category is None:
+            category = self._detect_category(message)
+        if not self._use_llm(events, category):
+            yield self._template_response(events, category)
+            return
+        
+        key = (category, events_digest(events))
+        cached = self._completions.get(key)
+        if cached is not None:
+            self.llm_stats["cache_hits"] += 1
+            yield cached
+            return
+        self.llm_stats["cache_misses"] += 1
+        if self._semaphore.locked():
+            yield self._fallback("saturated", events, category)
+            return
+        
+        async with self._semaphore, AsyncExitStack() as stack:
+            
+            async def first_token() -> Tuple[AsyncIterator[str], str]:
+                response = await stack.enter_async_context(self._open_stream(message, events, category))
+                tokens = self._iter_tokens(response)
+                return tokens, await tokens.__anext__()
+            
+            chunks: List[str] = []
+            try:
+                tokens, first = await asyncio.wait_for(first_token(), settings.LLM_LATENCY_BUDGET)
+                chunks.append(first)
+                yield first
+                async for token in tokens:
+                    chunks.append(token)
+                    yield token
+            except (asyncio.TimeoutError, StopAsyncIteration, httpx.HTTPError, ValueError) as e:
+                if chunks:
+                    logger.warning(f"OpenRouter stream ended early: {e!r}")
+                    return
+                reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                yield self._fallback(reason, events, category)
+                return
+        self.llm_stats["completions"] += 1
+        self._completions[key] = "".join(chunks)
+        
+    def _use_llm(self, events: List[Event], category: str) -> bool:
+        # Fixed answers (no data, unsupported category) never need the model
+        return settings.LLM_GENERATION_ENABLED and bool(events) and category != "earthquakes"
+        
+    def _fallback(self, reason: str, events: List[Event], category: str) -> str:
+        self.llm_stats[f"fallback_{reason}"] += 1
+        return self._template_response(events, category)
+        
+    def _completion_payload(self, message: str, events: List[Event], category: str, stream: bool) -> Dict[str, Any]:
+        lines = []
+        for event in events[:PROMPT_EVENT_LIMIT]:
+            categories = ", ".join(cat.title for cat in event.categories)
+            latest = event.geometries[-1].date if event.geometries else "unknown date"
+            lines.append(f"- {event.title} ({categories}; last observed {latest})")
+        if len(events) > PROMPT_EVENT_LIMIT:
+            lines.append(f"- ... and {len(events) - PROMPT_EVENT_LIMIT} more")
+        prompt = (
+            f"Question: {message}\n"
+            f"Detected category: {category}\n"
+            f"Matching NASA EONET events ({len(events)} total):\n" + "\n".join(lines)
+        )
+        return {
+            "model": settings.OPENROUTER_MODEL,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": settings.LLM_MAX_TOKENS,
+            "temperature": 0.3,
+            "stream": stream,
+        }
+        
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}", "X-Title": "TerraChat"}
+        
+    async def _complete(self, message: str, events: List[Event], category: str) -> str:
+        """Request a non-streaming completion through the OpenRouter resilience policy"""
+        client = http_clients.get("openrouter")
+        payload = self._completion_payload(message, events, category, stream=False)
+        
+        async def request() -> httpx.Response:
+            response = await client.post("/chat/completions", json=payload, headers=self._headers())
+            response.raise_for_status()
+            return response
+        
+        response = await self.upstream.call(request)
+        self.llm_stats["completions"] += 1
+        return response.json()["choices"][0]["message"]["content"].strip()
+        
+    @asynccontextmanager
+    async def _open_stream(self, message: str, events: List[Event], category: str) -> AsyncIterator[httpx.Response]:
+        """Open a streaming completion; the response body is read incrementally"""
+        client = http_clients.get("openrouter")
+        payload = self._completion_payload(message, events, category, stream=True)
+        http_request = client.build_request(
+            "POST", "/chat/completions", json=payload, headers=self._headers(),
+            extensions={"terrachat_stream": True},
+        )
+        
+        async def request() -> httpx.Response:
+            response = await client.send(http_request, stream=True)
+            if response.is_error:
+                await response.aread()
+                await response.aclose()
+                response.raise_for_status()
+            return response
+        
+        response = await self.upstream.call(request)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+        
+    @staticmethod
+    async def _iter_tokens(response: httpx.Response) -> AsyncIterator[str]:
+        """Parse OpenAI-style `data:` lines from a streaming completion into content tokens"""
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return
+            choices = json.loads(data).get("choices") or [{}]
+            token = (choices[0].get("delta") or {}).get("content")
+            if token:
+                yield token
+        
+    def completion_cache_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._completions),
+            "hits": self.llm_stats["cache_hits"],
+            "misses": self.llm_stats["cache_misses"],
+            "in_flight": settings.LLM_MAX_CONCURRENCY - self._semaphore._value,
+            **self.llm_stats,
+        }
+        
+    def _template_response(self, events: List[Event], category: str) -> str:
         """
-        Generate a conversational response about the events
+        Build the templated response about the events.
+        It depends only on the category and events, which keeps it cacheable.
         """
         # Check if user asked specifically about earthquakes
-        if "earthquake" in message.lower():
+        if category == "earthquakes":
             return """I understand you're asking about earthquakes, but unfortunately the EONET (Earth Observatory Natural Event Tracker) API doesn't currently provide earthquake data. 
 
 EONET focuses on events that can be observed from space, such as:
@@ -116,17 +276,16 @@ Would you like to explore other natural events that are available, such as recen
         if not events:
             return "I couldn't find any recent natural events matching your query. Try asking about wildfires, volcanoes, floods, storms, or other natural phenomena."
         
-        # Extract the specific category the user asked about
-        specific_category = self._detect_category(message)
+        # The specific category the user asked about
+        specific_category = category
         if specific_category == "all":
             specific_category = None
             
         # Count events by category to provide accurate information
         category_counts = {}
         for event in events:
-            event_categories = event.get("categories", [])
-            for cat in event_categories:
-                cat_title = cat.get("title", "").lower()
+            for cat in event.categories:
+                cat_title = cat.title.lower()
                 category_counts[cat_title] = category_counts.get(cat_title, 0) + 1
         
         # Generate specific response based on what was asked
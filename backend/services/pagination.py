@@ -0,0 +1,67 @@
+import base64
+import json
+from typing import List, Optional, Set, Tuple
+from models.schemas import Event
+
+
+def encode_cursor(last_id: str, offset: int) -> str:
+    """Encode the position after the last returned event as an opaque cursor"""
+    payload = json.dumps({"after": last_id, "offset": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor produced by encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(payload["after"]), int(payload["offset"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def paginate(events: List[Event], cursor: Optional[str], limit: Optional[int]) -> Tuple[List[Event], Optional[str]]:
+    """
+    Return one page of events and the cursor for the next page.
+
+    Without a limit every remaining event is returned, so clients that predate
+    pagination keep getting complete results.
+
+    The cursor resumes after the last returned event id so pages stay stable
+    when the snapshot refreshes between requests; if that event is gone the
+    stored offset is used instead.
+    """
+    start = 0
+    if cursor:
+        after_id, offset = decode_cursor(cursor)
+        start = max(0, offset)
+        if not (0 < offset <= len(events) and events[offset - 1].id == after_id):
+            for index, event in enumerate(events):
+                if event.id == after_id:
+                    start = index + 1
+                    break
+
+    page = events[start:] if limit is None else events[start:start + limit]
+    end = start + len(page)
+    next_cursor = encode_cursor(page[-1].id, end) if page and end < len(events) else None
+    return page, next_cursor
+
+
+def project_event(event: Event, geometry: str = "full") -> Event:
+    """
+    Apply a geometry projection: 'full' keeps every geometry, 'latest' only the most recent.
+    'none' is handled by excluding the field at serialization time.
+    Copies are made without re-validation.
+    """
+    if geometry != "latest" or len(event.geometries) <= 1:
+        return event
+    latest = max(event.geometries, key=lambda geom: geom.date or "")
+    return event.model_copy(update={"geometries": [latest]})
+
+
+def excluded_fields(fields: Optional[List[str]], geometry: str, all_fields: Set[str]) -> Set[str]:
+    """Event fields to leave out of the serialized response"""
+    excluded = set() if fields is None else all_fields - set(fields) - {"id"}
+    if geometry == "none":
+        excluded.add("geometries")
+    return excluded
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import math
+import time
+from cachetools import LRUCache
+from fastapi import Request
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+from config import settings
+from services.cache_backend import CacheBackend, create_cache_backend
+from services.resilience import upstream_policies
+
+logger = logging.getLogger(__name__)
+
+# Buckets hold a minute's worth of tokens, so shared spending is counted per minute
+SHARED_WINDOW_SECONDS = 60
+
+
+class RouteLimit(NamedTuple):
+    name: str
+    capacity: float
+    refill_per_second: float
+
+
+class TokenBucket:
+    """Tokens available to one client on one route, refilled lazily on access"""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimitExceeded(Exception):
+    """Raised by the route dependency when a client's bucket cannot cover the request"""
+
+    def __init__(self, limit: RouteLimit, retry_after: float, reset_after: float) -> None:
+        super().__init__(f"{limit.capacity:g} per 1 minute")
+        self.limit = limit
+        self.retry_after = retry_after
+        self.reset_after = reset_after
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Retry-After": str(math.ceil(self.retry_after)),
+            "X-RateLimit-Limit": f"{self.limit.capacity:g}",
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+
+
+class RateLimiter:
+    """
+    Per-client token buckets for each rate-limited route group.
+
+    Every request pays `cached_cost` up front; routes charge the difference to
+    `uncached_cost` once they know the answer was not served from cache. That
+    extra cost grows with upstream concurrency utilization, so clients back off
+    sooner while NASA/OpenRouter are busy. Charges after the fact may leave a
+    bucket in debt, which delays that client's next requests.
+
+    Buckets live in process memory and are only touched from the event loop:
+    the admission dependency is a coroutine, so FastAPI does not hand it to the
+    threadpool, and no bucket update spans an await, so no locking is needed.
+    With a shared cache backend each worker also adds its spending to
+    per-minute counters every `sync_interval` seconds and caps its buckets at
+    what the client has left across all workers, so limits hold cluster-wide
+    once the workers have synced.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_clients: int = 10000,
+        cached_cost: float = 1,
+        uncached_cost: float = 4,
+        load: Callable[[], float] = lambda: 0.0,
+        shared: bool = False,
+        sync_interval: float = 1.0,
+    ) -> None:
+        self.enabled = enabled
+        self.shared = shared
+        self.sync_interval = sync_interval
+        self.cached_cost = cached_cost
+        self.uncached_cost = uncached_cost
+        self._load = load
+        self._limits: Dict[str, RouteLimit] = {}
+        # Least recently seen clients are dropped and start again with a full bucket
+        self._buckets: LRUCache = LRUCache(maxsize=max_clients)
+        # Tokens spent since the last sync, per (route group, client)
+        self._pending: Dict[Tuple[str, str], float] = {}
+        self._backend: Optional[CacheBackend] = None
+        self._task: Optional[asyncio.Task] = None
+        self.allowed = 0
+        self.rejected = 0
+        self.charged = 0.0
+
+    def register(self, name: str, per_minute: float) -> None:
+        """Add a route group whose buckets hold a minute's worth of tokens"""
+        self._limits[name] = RouteLimit(name, float(per_minute), per_minute / 60)
+
+    def _bucket(self, limit: RouteLimit, client: str) -> TokenBucket:
+        now = time.monotonic()
+        key = (limit.name, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(limit.capacity, now)
+            self._buckets[key] = bucket
+        else:
+            bucket.tokens = min(limit.capacity, bucket.tokens + (now - bucket.updated) * limit.refill_per_second)
+            bucket.updated = now
+        return bucket
+
+    def _spend(self, limit: RouteLimit, client: str, bucket: TokenBucket, cost: float) -> None:
+        # Debt is capped at one full bucket
+        bucket.tokens = max(-limit.capacity, bucket.tokens - cost)
+        self.charged += cost
+        if self._backend is not None:
+            key = (limit.name, client)
+            self._pending[key] = self._pending.get(key, 0.0) + cost
+
+    def limit(self, name: str) -> Callable[[Request], Awaitable[None]]:
+        """FastAPI dependency charging `cached_cost` to the client's bucket for route group `name`"""
+        limit = self._limits[name]
+
+        # Async so it runs on the event loop with charge() and _sync(), never in a worker thread
+        async def dependency(request: Request) -> None:
+            if not self.enabled:
+                return
+            client = request.client.host if request.client else "127.0.0.1"
+            bucket = self._bucket(limit, client)
+            if bucket.tokens < self.cached_cost:
+                self.rejected += 1
+                raise RateLimitExceeded(
+                    limit,
+                    retry_after=(self.cached_cost - bucket.tokens) / limit.refill_per_second,
+                    reset_after=self._reset_after(limit, bucket),
+                )
+            self._spend(limit, client, bucket, self.cached_cost)
+            self.allowed += 1
+            request.state.rate_limit = (limit, client, bucket)
+
+        return dependency
+
+    @property
+    def miss_cost(self) -> float:
+        """Extra cost of a request that was not served from cache, scaled by upstream load"""
+        return (self.uncached_cost - self.cached_cost) * (1 + self._load())
+
+    def charge(self, request: Request, cost: float) -> None:
+        """Take additional tokens for work done after the request was admitted"""
+        state = getattr(request.state, "rate_limit", None)
+        if state is None or cost <= 0:
+            return
+        limit, client, bucket = state
+        self._spend(limit, client, bucket, cost)
+
+    def headers(self, request: Request) -> Dict[str, str]:
+        """Backpressure headers describing the client's bucket after this request"""
+        state = getattr(request.state, "rate_limit", None)
+        if state is None:
+            return {}
+        limit, _, bucket = state
+        return {
+            "X-RateLimit-Limit": f"{limit.capacity:g}",
+            "X-RateLimit-Remaining": str(max(0, math.floor(bucket.tokens))),
+            "X-RateLimit-Reset": str(math.ceil(self._reset_after(limit, bucket))),
+        }
+
+    @staticmethod
+    def _reset_after(limit: RouteLimit, bucket: TokenBucket) -> float:
+        """Seconds until the bucket is full again"""
+        return (limit.capacity - bucket.tokens) / limit.refill_per_second
+
+    async def _sync(self) -> None:
+        """Publish this worker's spending and cap local buckets at the client's shared budget"""
+        pending, self._pending = self._pending, {}
+        window, elapsed = divmod(time.time(), SHARED_WINDOW_SECONDS)
+        ttl = 2 * SHARED_WINDOW_SECONDS
+
+        async def spent(name: str, client: str, cost: float) -> Optional[float]:
+            current = await self._backend.incr(f"{name}:{client}:{window:.0f}", cost, ttl)
+            previous = await self._backend.incr(f"{name}:{client}:{window - 1:.0f}", 0.0, ttl)
+            if current is None or previous is None:
+                return None
+            # Sliding-window estimate of the last minute's spending across all workers
+            return current + previous * (1 - elapsed / SHARED_WINDOW_SECONDS)
+
+        keys = list(pending)
+        totals = await asyncio.gather(*(spent(name, client, pending[(name, client)]) for name, client in keys))
+        for (name, client), total in zip(keys, totals):
+            if total is None:
+                # Shared storage is unavailable; this worker's own limits still apply
+                continue
+            limit = self._limits[name]
+            bucket = self._bucket(limit, client)
+            bucket.tokens = max(-limit.capacity, min(bucket.tokens, limit.capacity - total))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self._sync()
+            except Exception as e:
+                logger.warning(f"Rate limit sync failed: {e}")
+
+    def start(self) -> None:
+        """Start syncing buckets with the other workers when limits are shared"""
+        if not (self.enabled and self.shared) or self._task is not None:
+            return
+        self._backend = create_cache_backend("ratelimit", lambda value: str(value).encode(), float)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+        self._pending = {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "shared": self._backend is not None,
+            "limits_per_minute": {name: limit.capacity for name, limit in self._limits.items()},
+            "cached_cost": self.cached_cost,
+            "uncached_cost": self.uncached_cost,
+            "miss_cost": round(self.miss_cost, 2),
+            "clients": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "tokens_charged": round(self.charged, 2),
+            "upstream_concurrency": upstream_policies.concurrency.stats(),
+        }
+
+
+rate_limiter = RateLimiter(
+    enabled=settings.RATE_LIMIT_ENABLED,
+    max_clients=settings.RATE_LIMIT_MAX_CLIENTS,
+    cached_cost=settings.RATE_LIMIT_CACHED_COST,
+    uncached_cost=settings.RATE_LIMIT_UNCACHED_COST,
+    load=lambda: upstream_policies.concurrency.utilization,
+    shared=settings.CACHE_BACKEND == "redis",
+    sync_interval=settings.RATE_LIMIT_SYNC_INTERVAL,
+)
+rate_limiter.register("chat", settings.RATE_LIMIT_CHAT_PER_MINUTE)
+rate_limiter.register("events", settings.RATE_LIMIT_EVENTS_PER_MINUTE)
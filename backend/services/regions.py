@@ -0,0 +1,270 @@
+from cachetools import LRUCache
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+from models.schemas import Event
+from services.event_catalog import event_points
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Coarse continent outlines as (lon, lat) vertices for the regions recognised
+# by OpenRouterService.extract_intent. A region may have several outlines, since
+# island chains crossing the antimeridian (Aleutians, Chukotka, Polynesia) need
+# one on each side. Outlines may overlap (e.g. Europe/Asia around the Bosporus),
+# in which case an event belongs to every region it falls in. Hawaii and the
+# Pacific islands belong to Oceania; Hawaii is also in North America so that
+# "usa"/"united states" queries find it.
+REGION_POLYGONS: Dict[str, List[List[Tuple[float, float]]]] = {
+    "north america": [
+        [
+            (-168, 66), (-162, 71), (-140, 70), (-120, 76), (-95, 82), (-60, 83), (-20, 82),
+            (-15, 76), (-40, 60), (-52, 47), (-66, 44), (-70, 41), (-76, 35), (-80, 25),
+            (-60, 15), (-77, 7), (-83, 8), (-92, 14), (-105, 19), (-118, 32), (-125, 40),
+            (-125, 49), (-135, 57), (-152, 57), (-160, 54), (-170, 51.5), (-180, 51),
+            (-180, 53.5), (-172, 53.5), (-172, 64), (-168, 66),
+        ],
+        # Western Aleutians
+        [(172, 51.5), (180, 51), (180, 53.5), (172, 53.5)],
+        # Hawaiian Islands
+        [(-179, 24), (-162, 18), (-154, 18), (-154, 23), (-178, 29.5)],
+    ],
+    "south america": [
+        [
+            (-81, -5), (-80, 1), (-77, 8), (-72, 12), (-60, 11), (-50, 4), (-35, -5),
+            (-35, -10), (-40, -23), (-48, -28), (-58, -38), (-65, -42), (-65, -55),
+            (-70, -56), (-76, -50), (-74, -40), (-72, -30), (-71, -18), (-76, -14),
+        ],
+    ],
+    "europe": [
+        [
+            (-25, 35), (-10, 35), (-5, 35.8), (10, 37), (20, 34), (28.5, 34.8), (28.5, 36.6),
+            (27.3, 36.9), (26.8, 37.8), (26.2, 38.3), (26.4, 39.4), (26.1, 40.0), (26.7, 40.4),
+            (29.05, 40.95), (29.15, 41.25), (29.2, 41.5), (42, 41), (50, 42), (50, 45),
+            (60, 50), (60, 69), (68, 70), (60, 82), (10, 82), (-30, 70), (-25, 63),
+        ],
+    ],
+    "africa": [
+        [
+            (-18, 28), (-17, 21), (-17, 14), (-12, 5), (-8, 4), (5, 4), (9, 4), (10, -2),
+            (12, -6), (12, -17), (15, -28), (18, -35), (25, -35), (33, -28), (45, -26),
+            (51, -25), (50, -12), (41, -10), (40, -5), (44, 2), (51, 12), (44, 11),
+            (43, 13), (35, 28), (33, 31), (25, 32), (20, 31), (10, 37.5), (-2, 36),
+            (-6, 36), (-10, 32),
+        ],
+    ],
+    "asia": [
+        [
+            (29.1, 41.25), (30, 42), (42, 42), (50, 45), (60, 50), (60, 69), (68, 70),
+            (70, 77), (100, 80), (140, 76), (180, 72), (180, 62), (170, 60), (166, 55.5),
+            (158, 50.5), (150, 45.5), (146, 43), (145, 41), (142, 35), (143, 24), (131, 24),
+            (125, 20), (127, 12), (127, 5), (141, -3), (141, -10), (120, -11), (105, -8),
+            (95, 5), (92, 20), (80, 6), (72, 20), (62, 25), (57, 22), (52, 15), (43, 12),
+            (35, 28), (34, 31), (36, 36), (28.5, 36.2), (27.5, 36.8), (27.0, 37.7),
+            (26.5, 38.4), (26.6, 39.3), (26.2, 40.0), (26.7, 40.35), (28.9, 40.85), (29.0, 41.0),
+        ],
+        # Chukotka east of the antimeridian
+        [(-180, 62), (-174, 64), (-169, 65.8), (-175, 70), (-180, 72)],
+    ],
+    "oceania": [
+        [
+            (110, -10), (125, -10), (131, -1), (150, -1), (160, -6), (180, -12),
+            (180, -48), (165, -48), (146, -44), (130, -35), (114, -36), (112, -22),
+        ],
+        # Micronesia: Palau, the Marianas, Marshall Islands and Kiribati's Gilbert Islands
+        [(131, -1.5), (180, -1.5), (180, 15), (150, 22), (140, 22), (131, 10)],
+        # Polynesia east of the antimeridian, including Hawaii
+        [
+            (-180, -48), (-180, 29.5), (-170, 29.5), (-154, 23), (-154, 18), (-140, -5),
+            (-125, -20), (-125, -30), (-170, -48),
+        ],
+    ],
+}
+
+# Words and phrases referring to each region, in detection priority order
+REGION_SYNONYMS: Dict[str, List[str]] = {
+    "north america": ["north america", "north american", "usa", "united states"],
+    "europe": ["europe", "european"],
+    "asia": ["asia", "asian"],
+    "africa": ["africa", "african"],
+    "oceania": ["oceania", "australia", "australian", "new zealand"],
+    "south america": ["south america", "south american"],
+}
+
+# Events outside every outline (islands, storms at sea) join the nearest region
+# within this many degrees; events farther out belong to no region
+NEAREST_REGION_MAX_DEGREES = 12.0
+
+# Upper bound on points x edges evaluated at once, to cap temporary array size
+_MAX_CELLS_PER_CHUNK = 2_000_000
+
+
+def points_in_polygon(lon: "np.ndarray", lat: "np.ndarray", polygon: "np.ndarray") -> "np.ndarray":
+    """
+    Vectorized even-odd ray casting: test every point against every polygon edge at once.
+    Returns a boolean array aligned with `lon`/`lat`.
+    """
+    import numpy as np
+    
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    inside = np.zeros(lon.shape[0], dtype=bool)
+    chunk = max(1, _MAX_CELLS_PER_CHUNK // len(polygon))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start in range(0, lon.shape[0], chunk):
+            px = lon[start:start + chunk, None]
+            py = lat[start:start + chunk, None]
+            straddles = (y1 > py) != (y2 > py)
+            crossing_x = (x2 - x1) * (py - y1) / (y2 - y1) + x1
+            crossings = np.count_nonzero(straddles & (px < crossing_x), axis=1)
+            inside[start:start + chunk] = crossings % 2 == 1
+    return inside
+
+
+def distance_to_outline(lon: "np.ndarray", lat: "np.ndarray", polygon: "np.ndarray") -> "np.ndarray":
+    """
+    Approximate distance in degrees from every point to the nearest polygon edge,
+    on an equirectangular projection scaled by the cosine of each point's latitude.
+    """
+    import numpy as np
+    
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    distance = np.empty(lon.shape[0], dtype=float)
+    chunk = max(1, _MAX_CELLS_PER_CHUNK // len(polygon))
+    for start in range(0, lon.shape[0], chunk):
+        scale = np.cos(np.radians(lat[start:start + chunk]))[:, None]
+        px = lon[start:start + chunk, None] * scale
+        py = lat[start:start + chunk, None]
+        ax, bx = x1 * scale, x2 * scale
+        dx, dy = bx - ax, y2 - y1
+        length = dx * dx + dy * dy
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(length > 0, ((px - ax) * dx + (py - y1) * dy) / length, 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        distance[start:start + chunk] = np.hypot(px - (ax + t * dx), py - (y1 + t * dy)).min(axis=1)
+    return distance
+
+
+def _membership_key(event: Event) -> Tuple[Any, ...]:
+    # Region membership only changes when an event gains geometries
+    geometries = event.geometries
+    return event.id, len(geometries), geometries[-1].date if geometries else None
+
+
+class RegionClassifier:
+    """
+    Classifies events into continent regions by testing all of their geometry
+    coordinates (Points and Polygon vertices) against region polygons with NumPy.
+    Events inside no outline, such as oceanic islands, join the nearest region
+    within NEAREST_REGION_MAX_DEGREES.
+    Membership is cached per event so unchanged events are never re-tested.
+
+    NumPy is imported and the polygon arrays are built on first classification,
+    keeping both off the application's import path.
+    """
+
+    def __init__(
+        self,
+        polygons: Dict[str, Sequence[Sequence[Tuple[float, float]]]] = REGION_POLYGONS,
+        cache_size: int = 10000,
+    ) -> None:
+        self._vertices = polygons
+        self.names = frozenset(polygons)
+        self._arrays: Optional[List[Tuple[str, "np.ndarray", Tuple[float, float, float, float]]]] = None
+        self._cache: LRUCache = LRUCache(maxsize=cache_size)
+
+    def _polygons(self) -> List[Tuple[str, "np.ndarray", Tuple[float, float, float, float]]]:
+        """(region, outline array, bounding box) for every outline, built on first use"""
+        if self._arrays is None:
+            import numpy as np
+            
+            arrays = []
+            for name, outlines in self._vertices.items():
+                for vertices in outlines:
+                    poly = np.asarray(vertices, dtype=float)
+                    arrays.append((name, poly, (poly[:, 0].min(), poly[:, 1].min(), poly[:, 0].max(), poly[:, 1].max())))
+            self._arrays = arrays
+        return self._arrays
+
+    def is_region(self, region: Optional[str]) -> bool:
+        return bool(region) and region.lower() in self.names
+
+    def classify(self, events: List[Event]) -> List[FrozenSet[str]]:
+        """Return the set of regions each event falls in"""
+        results: List[Optional[FrozenSet[str]]] = [None] * len(events)
+        pending = []
+        for index, event in enumerate(events):
+            cached = self._cache.get(_membership_key(event))
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append(index)
+
+        if pending:
+            import numpy as np
+            
+            # Flatten every uncached event's coordinates into one array pair
+            lons: List[float] = []
+            lats: List[float] = []
+            owners: List[int] = []
+            for slot, index in enumerate(pending):
+                for lon, lat in event_points(events[index]):
+                    lons.append(lon)
+                    lats.append(lat)
+                    owners.append(slot)
+            lon = np.asarray(lons, dtype=float)
+            lat = np.asarray(lats, dtype=float)
+            owner = np.asarray(owners, dtype=np.intp)
+
+            memberships: List[set] = [set() for _ in pending]
+            for name, polygon, bounds in self._polygons():
+                min_lon, min_lat, max_lon, max_lat = bounds
+                candidates = np.flatnonzero((lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat))
+                if candidates.size == 0:
+                    continue
+                inside = points_in_polygon(lon[candidates], lat[candidates], polygon)
+                for slot in np.unique(owner[candidates[inside]]):
+                    memberships[slot].add(name)
+            self._assign_nearest(lon, lat, owner, memberships)
+
+            for slot, index in enumerate(pending):
+                regions = frozenset(memberships[slot])
+                self._cache[_membership_key(events[index])] = regions
+                results[index] = regions
+
+        return results
+
+    def _assign_nearest(self, lon: "np.ndarray", lat: "np.ndarray", owner: "np.ndarray", memberships: List[set]) -> None:
+        """Put events that fall in no outline into the region nearest to any of their points"""
+        import numpy as np
+        
+        unmatched = [slot for slot, regions in enumerate(memberships) if not regions]
+        if not unmatched:
+            return
+        mask = np.isin(owner, unmatched)
+        if not mask.any():
+            return
+        lon, lat, owner = lon[mask], lat[mask], owner[mask]
+        best = np.full(lon.shape[0], np.inf)
+        nearest = np.empty(lon.shape[0], dtype=object)
+        for name, polygon, _ in self._polygons():
+            distance = distance_to_outline(lon, lat, polygon)
+            closer = distance < best
+            best[closer] = distance[closer]
+            nearest[closer] = name
+        for slot in unmatched:
+            points = np.flatnonzero(owner == slot)
+            if points.size == 0:
+                continue
+            closest = points[np.argmin(best[points])]
+            if best[closest] <= NEAREST_REGION_MAX_DEGREES:
+                memberships[slot].add(nearest[closest])
+
+    def filter(self, events: List[Event], region: Optional[str]) -> List[Event]:
+        """Keep events in the given region; unknown regions and 'all' keep everything"""
+        if not self.is_region(region):
+            return events
+        region = region.lower()
+        return [event for event, regions in zip(events, self.classify(events)) if region in regions]
+
+
+region_classifier = RegionClassifier()
@@ -0,0 +1,331 @@
+import asyncio
+import httpx
+import logging
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept per upstream for the hedging percentile
+LATENCY_WINDOW = 200
+# Hedging only starts once this many samples have been seen
+MIN_HEDGE_SAMPLES = 20
+
+
+class UpstreamUnavailable(httpx.HTTPError):
+    """Raised without calling the upstream while its circuit breaker is open or no concurrency slot is free"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transport failures, timeouts, 429 and 5xx responses are worth retrying"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """
+    Classic closed/open/half-open breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast for `reset_timeout` seconds; then one trial call is let through
+    and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.opens = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._trial_in_flight = False
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give up a half-open trial without an outcome, e.g. when the caller was cancelled"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of recent traffic so retries cannot multiply load
+    on an upstream that is already struggling. Every call deposits `ratio`
+    tokens; every retry withdraws one.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 3, max_tokens: float = 20) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class UpstreamConcurrencyLimit:
+    """
+    Global cap on in-flight upstream calls, shared by every policy.
+    Callers wait up to `queue_timeout` seconds for a slot before giving up.
+    """
+
+    def __init__(self, limit: int = 16, queue_timeout: float = 2) -> None:
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.rejected = 0
+
+    @property
+    def utilization(self) -> float:
+        return self.in_flight / self.limit if self.limit else 0.0
+
+    @asynccontextmanager
+    async def slot(self, name: str) -> AsyncIterator[None]:
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise UpstreamUnavailable(f"No upstream concurrency slot free for {name}")
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "utilization": round(self.utilization, 3),
+            "rejected": self.rejected,
+        }
+
+
+class UpstreamPolicy:
+    """
+    Resilience policy for calls to one upstream: circuit breaker, bounded
+    exponential-backoff retries under a retry budget, and optional hedging.
+
+    A hedged call starts a second attempt when the first has not finished
+    within the configured latency percentile and uses whichever finishes first.
+    Hedging is only meant for idempotent requests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        retry_budget_ratio: float = 0.2,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        hedge_percentile: float = 0,
+        concurrency: Optional[UpstreamConcurrencyLimit] = None,
+    ) -> None:
+        self.name = name
+        self.concurrency = concurrency or UpstreamConcurrencyLimit()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.budget = RetryBudget(retry_budget_ratio)
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.failures = 0
+        self.short_circuits = 0
+        self.retries = 0
+        self.retries_denied = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if len(self._latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    async def _timed(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        async with self.concurrency.slot(self.name):
+            started = time.monotonic()
+            result = await fn()
+            self._latencies.append(time.monotonic() - started)
+        return result
+
+    async def _attempt(self, fn: Callable[[], Awaitable[Any]], hedge: bool) -> Any:
+        delay = self.latency_percentile(self.hedge_percentile) if hedge and self.hedge_percentile else None
+        if delay is None:
+            return await self._timed(fn)
+
+        primary = asyncio.ensure_future(self._timed(fn))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.hedges += 1
+            hedged = asyncio.ensure_future(self._timed(fn))
+            pending.add(hedged)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedged:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both attempts failed; surface the primary's error
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], hedge: bool = False) -> Any:
+        """
+        Run `fn` under the policy. `fn` must raise for unsuccessful responses
+        (e.g. via `raise_for_status`) so they can be retried and counted.
+        """
+        self.calls += 1
+        if not self.breaker.allow():
+            self.short_circuits += 1
+            raise UpstreamUnavailable(f"Circuit breaker for {self.name} is open")
+        self.budget.deposit()
+
+        attempt = 0
+        while True:
+            try:
+                result = await self._attempt(fn, hedge)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except UpstreamUnavailable:
+                # No concurrency slot was free, so the upstream was never reached
+                # and says nothing about its health either way
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # Client errors say nothing about upstream health
+                    self.breaker.record_success()
+                    raise
+                if attempt >= self.max_retries or self.breaker.state != "closed":
+                    self._record_failure()
+                    raise
+                if not self.budget.withdraw():
+                    self.retries_denied += 1
+                    self._record_failure()
+                    raise
+                attempt += 1
+                self.retries += 1
+                # Full jitter keeps retries from many callers from lining up
+                backoff = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+                logger.warning(f"{self.name} request failed ({e!r}), retry {attempt}/{self.max_retries}")
+                await asyncio.sleep(random.uniform(0, backoff))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _record_failure(self) -> None:
+        self.failures += 1
+        was_open = self.breaker.state == "open"
+        self.breaker.record_failure()
+        if self.breaker.state == "open" and not was_open:
+            logger.error(f"Circuit breaker for {self.name} opened for {self.breaker.reset_timeout}s")
+
+    def record_fallback(self) -> None:
+        """Count a call answered from cached data after the upstream failed"""
+        self.fallbacks += 1
+
+    def stats(self) -> Dict[str, Any]:
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        return {
+            "circuit": self.breaker.state,
+            "circuit_opens": self.breaker.opens,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "calls": self.calls,
+            "failures": self.failures,
+            "short_circuits": self.short_circuits,
+            "retries": self.retries,
+            "retries_denied": self.retries_denied,
+            "retry_budget": round(self.budget.tokens, 2),
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+            "latency_p50": round(p50, 4) if p50 is not None else None,
+            "latency_p95": round(p95, 4) if p95 is not None else None,
+        }
+
+
+class UpstreamPolicyRegistry:
+    """One resilience policy per upstream, shared by every service calling it"""
+
+    def __init__(self) -> None:
+        self._policies: Dict[str, UpstreamPolicy] = {}
+        self.concurrency = UpstreamConcurrencyLimit(settings.UPSTREAM_MAX_CONCURRENCY, settings.UPSTREAM_QUEUE_TIMEOUT)
+
+    def register(self, name: str, hedge_percentile: float = 0) -> UpstreamPolicy:
+        policy = UpstreamPolicy(
+            name,
+            max_retries=settings.UPSTREAM_MAX_RETRIES,
+            backoff_base=settings.UPSTREAM_RETRY_BACKOFF,
+            backoff_max=settings.UPSTREAM_RETRY_BACKOFF_MAX,
+            retry_budget_ratio=settings.UPSTREAM_RETRY_BUDGET,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+            hedge_percentile=hedge_percentile,
+            concurrency=self.concurrency,
+        )
+        self._policies[name] = policy
+        return policy
+
+    def get(self, name: str) -> UpstreamPolicy:
+        return self._policies[name]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: policy.stats() for name, policy in self._policies.items()}
+
+
+upstream_policies = UpstreamPolicyRegistry()
+upstream_policies.register("eonet", hedge_percentile=settings.EONET_HEDGE_PERCENTILE)
+# OpenRouter calls are POSTs that cost tokens, so they are never hedged
+upstream_policies.register("openrouter")
@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import logging
+from fastapi import Request
+from fastapi.responses import Response
+from typing import Any, Dict, Hashable, Optional, Tuple
+from services.cache_backend import CountingLRUCache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+
+class EncodedResponse:
+    """
+    Final response body with its compressed variants and strong ETag.
+
+    Bodies that are served repeatedly (cached responses, static files) are
+    precompressed in every encoding. One-off bodies are only compressed in the
+    single encoding the client negotiates, when it is served.
+    """
+
+    __slots__ = ("body", "gzip", "br", "etag", "compressible")
+
+    def __init__(self, body: bytes, compress: bool = True, precompress: bool = True) -> None:
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.gzip = None
+        self.br = None
+        self.compressible = compress and len(body) >= MIN_COMPRESS_SIZE
+        if self.compressible and precompress:
+            self.gzip = gzip.compress(body, compresslevel=6)
+            if brotli is not None:
+                self.br = brotli.compress(body, quality=5)
+
+    def negotiate(self, accepted: set) -> Tuple[bytes, Optional[str]]:
+        """Body and Content-Encoding for the best encoding the client accepts, compressing on first use"""
+        if not self.compressible:
+            return self.body, None
+        if brotli is not None and "br" in accepted:
+            if self.br is None:
+                self.br = brotli.compress(self.body, quality=5)
+            return self.br, "br"
+        if "gzip" in accepted or "*" in accepted:
+            if self.gzip is None:
+                self.gzip = gzip.compress(self.body, compresslevel=6)
+            return self.gzip, "gzip"
+        return self.body, None
+
+
+def _accepted_encodings(request: Request) -> set:
+    encodings = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            encodings.add(name.lower())
+    return encodings
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so ignore W/ prefixes
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def render_response(
+    request: Request,
+    encoded: EncodedResponse,
+    media_type: str = "application/json",
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Serve an encoded body, honouring If-None-Match and Accept-Encoding"""
+    headers = {**(headers or {}), "ETag": encoded.etag, "Vary": "Accept-Encoding"}
+    if etag_matches(request, encoded.etag):
+        return Response(status_code=304, headers=headers)
+
+    content, encoding = encoded.negotiate(_accepted_encodings(request))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded responses keyed on the normalized request intent.
+
+    Entries belong to one EONET snapshot version; the whole cache is dropped
+    as soon as a request observes a newer snapshot.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._entries = CountingLRUCache(maxsize=maxsize)
+        self.version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: int) -> None:
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info(f"Snapshot changed to version {version}, dropping {len(self._entries)} cached responses")
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key: Hashable, version: int) -> Optional[EncodedResponse]:
+        self._check_version(version)
+        encoded = self._entries.get(key)
+        if encoded is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return encoded
+
+    def put(self, key: Hashable, version: int, body: bytes) -> EncodedResponse:
+        self._check_version(version)
+        encoded = EncodedResponse(body)
+        self._entries[key] = encoded
+        return encoded
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self._entries.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from pydantic import BaseModel
+from typing import List, Optional
+from models.schemas import Event
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotContents(BaseModel):
+    saved_at: float
+    window_days: int
+    events: List[Event]
+
+
+class SnapshotFile:
+    """
+    Last-known-good EONET snapshot persisted as compact JSON on local disk.
+
+    Writes go to a temporary file that is atomically renamed into place, so
+    any number of worker processes can read the file while another replaces it.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    def _write(self, contents: SnapshotContents) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(contents.model_dump_json().encode())
+        os.replace(tmp_path, self.path)
+
+    def _read(self) -> Optional[SnapshotContents]:
+        if not self.path.is_file():
+            return None
+        return SnapshotContents.model_validate_json(self.path.read_bytes())
+
+    async def save(self, events: List[Event], window_days: int) -> None:
+        """Persist the snapshot without blocking the event loop"""
+        contents = SnapshotContents.model_construct(saved_at=time.time(), window_days=window_days, events=events)
+        try:
+            await asyncio.to_thread(self._write, contents)
+            logger.info(f"Saved EONET snapshot with {len(events)} events to {self.path}")
+        except OSError as e:
+            logger.warning(f"Could not save EONET snapshot to {self.path}: {e}")
+
+    async def load(self) -> Optional[SnapshotContents]:
+        """Read the persisted snapshot, or None if it is missing or unreadable"""
+        try:
+            contents = await asyncio.to_thread(self._read)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable EONET snapshot at {self.path}: {e}")
+            return None
+        if contents is not None:
+            logger.info(f"Loaded EONET snapshot with {len(contents.events)} events from {self.path}")
+        return contents
@@ -0,0 +1,104 @@
+import logging
+import mimetypes
+import os
+from pathlib import Path
+from typing import Dict, Optional
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from services.response_cache import EncodedResponse, etag_matches, render_response
+
+logger = logging.getLogger(__name__)
+
+# Next.js puts content-hashed assets here, so they never change under the same URL
+IMMUTABLE_PREFIX = "_next/static/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Everything else may change between deploys and is revalidated with its ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Directories never worth indexing when the frontend source tree is served directly
+SKIPPED_DIRECTORIES = {"node_modules", "__pycache__"}
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+    "text/javascript",
+}
+
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+class StaticAsset:
+    """One file of the exported frontend, with its body held in memory when small"""
+
+    __slots__ = ("path", "media_type", "cache_control", "encoded", "etag")
+
+    def __init__(self, path: Path, relative: str, media_type: str, max_memory_bytes: int) -> None:
+        self.path = path
+        self.media_type = media_type
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if relative.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE_CONTROL
+        self.encoded: Optional[EncodedResponse] = None
+        stat = path.stat()
+        if stat.st_size <= max_memory_bytes:
+            self.encoded = EncodedResponse(path.read_bytes(), compress=_is_compressible(media_type))
+            self.etag = self.encoded.etag
+        else:
+            # Large files stay on disk; size and mtime identify the version
+            self.etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    def response(self, request: Request) -> Response:
+        headers = {"Cache-Control": self.cache_control}
+        if self.encoded is not None:
+            return render_response(request, self.encoded, media_type=self.media_type, headers=headers)
+        headers["ETag"] = self.etag
+        if etag_matches(request, self.etag):
+            return Response(status_code=304, headers=headers)
+        return FileResponse(str(self.path), media_type=self.media_type, headers=headers)
+
+
+class StaticSite:
+    """
+    Route table for the exported frontend, built once at startup.
+
+    Every file is indexed under its relative path, `index.html` files also
+    under their directory and other `.html` pages under their extensionless
+    path, so requests are resolved with a dict lookup instead of filesystem
+    calls. Small files are kept in memory with gzip/brotli variants and a
+    strong ETag; content-hashed `_next/static` assets are served as immutable.
+    """
+
+    def __init__(self, root: Path, max_memory_bytes: int = 512 * 1024) -> None:
+        self.root = root
+        self.max_memory_bytes = max_memory_bytes
+        self.routes: Dict[str, StaticAsset] = {}
+
+    def build(self) -> None:
+        routes: Dict[str, StaticAsset] = {}
+        memory_bytes = 0
+        for directory, subdirectories, files in os.walk(self.root):
+            subdirectories[:] = [name for name in subdirectories if name not in SKIPPED_DIRECTORIES and not name.startswith(".")]
+            for name in files:
+                path = Path(directory) / name
+                relative = path.relative_to(self.root).as_posix()
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                try:
+                    asset = StaticAsset(path, relative, media_type, self.max_memory_bytes)
+                except OSError as e:
+                    logger.warning(f"Skipping unreadable frontend file {relative}: {e}")
+                    continue
+                if asset.encoded is not None:
+                    memory_bytes += len(asset.encoded.body)
+                routes[relative] = asset
+                if name == "index.html":
+                    routes.setdefault(relative[: -len("index.html")].rstrip("/"), asset)
+                elif name.endswith(".html"):
+                    routes.setdefault(relative[: -len(".html")], asset)
+        self.routes = routes
+        logger.info(f"Indexed {len(routes)} frontend routes from {self.root} ({memory_bytes / 1024:.0f} KiB in memory)")
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        return self.routes.get(path.strip("/"))
@@ -0,0 +1,7 @@
+import os
+
+# Settings are read at import time; keep tests off the network and the real snapshot file
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("NASA_API_KEY", "test")
+os.environ.setdefault("EONET_SNAPSHOT_PATH", "")
+os.environ.setdefault("LOG_FILE", os.devnull)
@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from models.schemas import Event
+from services.event_store import EventStore
+
+WILDFIRES = 8
+VOLCANOES = 12
+
+
+def make_event(
+    event_id: str,
+    lon: float = -120.0,
+    lat: float = 37.0,
+    days_ago: float = 1,
+    category: int = WILDFIRES,
+    description: Optional[str] = None,
+    closed: Optional[str] = None,
+) -> Event:
+    date = (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return Event(
+        id=event_id,
+        title=event_id,
+        description=description,
+        categories=[{"id": category, "title": str(category)}],
+        geometries=[{"date": date, "type": "Point", "coordinates": [lon, lat]}],
+        sources=[],
+        closed=closed,
+    )
+
+
+def loaded_store(*events: Event) -> EventStore:
+    store = EventStore(fetch=None)
+    store.load(list(events))
+    return store
+
+
+def ids(events: List[Event]) -> List[str]:
+    return [event.id for event in events]
+
+
+def test_merge_adds_replaces_and_removes():
+    store = loaded_store(make_event("a"), make_event("b"), make_event("c"))
+    version = store.version
+    # "b" gains a newer position in Asia and a different category
+    moved = make_event("b", category=VOLCANOES)
+    moved.geometries += make_event("b", lon=139.7, lat=35.7, days_ago=0.5).geometries
+
+    changes = store.merge([make_event("new"), moved], [make_event("c", closed="2026-01-01T00:00:00Z")])
+
+    assert changes == 3
+    assert store.version == version + 1
+    # New events go first; the rest keep their order
+    assert ids(store.events) == ["new", "a", "b"]
+    assert ids(store.query(30, region="asia")) == ["b"]
+    assert ids(store.query(30, category_id=VOLCANOES)) == ["b"]
+    assert ids(store.query(30, category_id=WILDFIRES)) == ["new", "a"]
+
+
+def test_unchanged_events_leave_the_snapshot_alone():
+    original = make_event("a")
+    store = loaded_store(original, make_event("b"))
+    catalog, version = store.catalog, store.version
+
+    assert store.merge([original, make_event("b")], []) == 0
+    assert store.catalog is catalog
+    assert store.version == version
+
+
+def test_description_only_change_is_merged():
+    store = loaded_store(make_event("a", description="Small fire"))
+    assert store.merge([make_event("a", description="Fire, 40% contained")], []) == 1
+    assert store.catalog.get("a").description == "Fire, 40% contained"
+
+
+def test_events_closed_in_the_same_delta_are_dropped():
+    store = loaded_store(make_event("a"), make_event("b"))
+    changes = store.merge(
+        [make_event("a", description="Updated"), make_event("b", closed="2026-01-01T00:00:00Z"), make_event("new")],
+        [make_event("a", closed="2026-01-01T00:00:00Z"), make_event("never-seen", closed="2026-01-01T00:00:00Z")],
+    )
+    assert changes == 3
+    assert ids(store.events) == ["new"]
+
+
+def test_merged_events_move_in_the_time_window():
+    store = loaded_store(make_event("old", days_ago=20), make_event("recent"))
+    assert ids(store.query(7)) == ["recent"]
+    store.merge([make_event("old", days_ago=0.5)], [])
+    assert ids(store.query(7)) == ["old", "recent"]
+
+
+class FakeEONET:
+    def __init__(self, events: List[Event]) -> None:
+        self.events = events
+        self.delta: Tuple[List[Event], List[Event]] = ([], [])
+        self.full_fetches = 0
+        self.delta_fetches = 0
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def fetch(self, days: int) -> List[Event]:
+        self.full_fetches += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("EONET unavailable")
+        return self.events
+
+    async def fetch_delta(self, days: int) -> Tuple[List[Event], List[Event]]:
+        self.delta_fetches += 1
+        return self.delta
+
+
+def test_refresh_merges_deltas_between_full_syncs():
+    async def scenario() -> None:
+        upstream = FakeEONET([make_event("a"), make_event("b")])
+        upstream.release.set()
+        store = EventStore(upstream.fetch, fetch_delta=upstream.fetch_delta, full_sync_interval=3600)
+
+        assert await store.refresh()
+        upstream.delta = ([make_event("new")], [make_event("a", closed="2026-01-01T00:00:00Z")])
+        assert await store.refresh()
+
+        assert (upstream.full_fetches, upstream.delta_fetches) == (1, 1)
+        assert ids(store.events) == ["new", "b"]
+        assert store.stats()["delta_changes"] == 2
+
+        store.full_sync_interval = 0
+        assert await store.refresh()
+        assert upstream.full_fetches == 2
+        assert ids(store.events) == ["a", "b"]
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_keeps_the_previous_snapshot():
+    async def scenario() -> None:
+        upstream = FakeEONET([make_event("a")])
+        upstream.release.set()
+        store = EventStore(upstream.fetch)
+        assert await store.refresh()
+        version = store.version
+
+        upstream.fail = True
+        assert not await store.refresh()
+        assert ids(store.events) == ["a"]
+        assert store.version == version
+
+    asyncio.run(scenario())
+
+
+def test_stale_queries_and_the_background_loop_share_one_refresh():
+    async def scenario() -> None:
+        upstream = FakeEONET([make_event("a"), make_event("b")])
+        store = EventStore(upstream.fetch, refresh_interval=60)
+        store.load([make_event("a")], age=120)
+        assert store.is_stale
+
+        # Stale snapshots are served while the refresh runs
+        for _ in range(5):
+            assert ids(store.query(30)) == ["a"]
+        store.start()
+        await asyncio.sleep(0)
+        assert upstream.full_fetches == 1
+
+        upstream.release.set()
+        assert await store.trigger_refresh()
+        assert ids(store.query(30)) == ["a", "b"]
+        assert not store.is_stale
+        await store.stop()
+        assert upstream.full_fetches == 1
+
+    asyncio.run(scenario())
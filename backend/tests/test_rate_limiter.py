@@ -0,0 +1,141 @@
+import asyncio
+import fakeredis
+import pytest
+from starlette.requests import Request
+import services.rate_limiter as rate_limiter_module
+from services.cache_backend import RedisCacheBackend
+from services.rate_limiter import RateLimiter, RateLimitExceeded
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    return clock
+
+
+def make_request(client: str = "203.0.113.7") -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/api/chat", "headers": [], "client": (client, 50000)})
+
+
+def make_limiter(per_minute: float = 6, **kwargs) -> RateLimiter:
+    limiter = RateLimiter(cached_cost=1, uncached_cost=4, **kwargs)
+    limiter.register("chat", per_minute)
+    return limiter
+
+
+def admit(limiter: RateLimiter, request: Request) -> None:
+    asyncio.run(limiter.limit("chat")(request))
+
+
+def test_rejects_once_the_bucket_is_empty(clock):
+    limiter = make_limiter(per_minute=6)
+    for _ in range(6):
+        admit(limiter, make_request())
+    with pytest.raises(RateLimitExceeded) as rejected:
+        admit(limiter, make_request())
+
+    assert rejected.value.headers() == {
+        "Retry-After": "10",
+        "X-RateLimit-Limit": "6",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": "60",
+    }
+    assert limiter.stats()["allowed"] == 6
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_clients_have_separate_buckets(clock):
+    limiter = make_limiter(per_minute=1)
+    admit(limiter, make_request("203.0.113.7"))
+    admit(limiter, make_request("198.51.100.2"))
+    with pytest.raises(RateLimitExceeded):
+        admit(limiter, make_request("203.0.113.7"))
+
+
+def test_bucket_refills_over_time(clock):
+    limiter = make_limiter(per_minute=6)
+    for _ in range(6):
+        admit(limiter, make_request())
+    clock.now += 10
+    admit(limiter, make_request())
+    with pytest.raises(RateLimitExceeded):
+        admit(limiter, make_request())
+
+
+def test_admitted_requests_report_their_budget(clock):
+    limiter = make_limiter(per_minute=6)
+    request = make_request()
+    admit(limiter, request)
+    assert limiter.headers(request) == {"X-RateLimit-Limit": "6", "X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "10"}
+    assert limiter.headers(make_request()) == {}
+
+
+def test_charges_after_admission_leave_debt_capped_at_one_bucket(clock):
+    limiter = make_limiter(per_minute=6)
+    request = make_request()
+    admit(limiter, request)
+    limiter.charge(request, limiter.miss_cost)
+    limiter.charge(request, 100)
+    assert limiter.headers(request)["X-RateLimit-Remaining"] == "0"
+    assert limiter.headers(request)["X-RateLimit-Reset"] == "120"
+
+    # Paying the debt back takes one minute before the bucket admits again
+    clock.now += 60
+    with pytest.raises(RateLimitExceeded):
+        admit(limiter, make_request())
+    clock.now += 10
+    admit(limiter, make_request())
+
+
+def test_miss_cost_grows_with_upstream_load():
+    assert make_limiter().miss_cost == 3
+    assert make_limiter(load=lambda: 0.5).miss_cost == 4.5
+
+
+def test_disabled_limiter_admits_everything(clock):
+    limiter = make_limiter(per_minute=1, enabled=False)
+    for _ in range(5):
+        admit(limiter, make_request())
+    assert limiter.stats()["rejected"] == 0
+
+
+def test_workers_share_spending_through_the_cache_backend(clock, monkeypatch):
+    # Start of a shared one-minute window
+    monkeypatch.setattr(rate_limiter_module.time, "time", lambda: 60.0 * 28_000_000)
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        rate_limiter_module,
+        "create_cache_backend",
+        lambda namespace, dumps, loads: RedisCacheBackend(
+            namespace=namespace, dumps=dumps, loads=loads, client=fakeredis.FakeAsyncRedis(server=server),
+        ),
+    )
+
+    async def scenario() -> None:
+        workers = [make_limiter(per_minute=6, shared=True, sync_interval=3600) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        try:
+            for _ in range(4):
+                await workers[0].limit("chat")(make_request())
+            await workers[1].limit("chat")(make_request())
+            for worker in workers:
+                await worker._sync()
+            # Five of six tokens are spent across both workers, so the second one admits only one more
+            await workers[1].limit("chat")(make_request())
+            with pytest.raises(RateLimitExceeded):
+                await workers[1].limit("chat")(make_request())
+        finally:
+            for worker in workers:
+                await worker.stop()
+
+    asyncio.run(scenario())
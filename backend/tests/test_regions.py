@@ -0,0 +1,97 @@
+import pytest
+from models.schemas import Event
+from services.regions import RegionClassifier
+
+# (place, lon, lat, expected regions) for locations of recurring EONET events
+KNOWN_LOCATIONS = [
+    # Outline interiors
+    ("California wildfires", -120.0, 37.0, {"north america"}),
+    ("Etna", 15.0, 37.75, {"europe"}),
+    ("Moscow", 37.6, 55.75, {"europe"}),
+    ("Iceland", -19.0, 64.5, {"europe"}),
+    ("Ankara", 32.85, 39.93, {"asia"}),
+    ("Izmir", 27.14, 38.42, {"asia"}),
+    ("Athens", 23.7, 37.98, {"europe"}),
+    ("Rhodes", 28.0, 36.2, {"europe"}),
+    ("Lesbos", 26.3, 39.2, {"europe"}),
+    ("Istanbul, European side", 28.98, 41.01, {"europe"}),
+    ("Istanbul, Asian shore", 29.03, 40.99, {"europe", "asia"}),
+    ("Tokyo", 139.7, 35.7, {"asia"}),
+    ("Sakurajima", 130.66, 31.58, {"asia"}),
+    ("Nishinoshima", 140.88, 27.25, {"asia"}),
+    ("Mayon", 123.69, 13.26, {"asia"}),
+    ("Taal", 121.0, 14.0, {"asia"}),
+    ("Merapi", 110.44, -7.54, {"asia"}),
+    ("Karymsky", 159.4, 54.05, {"asia"}),
+    ("Klyuchevskoy", 160.64, 56.06, {"asia"}),
+    ("Ebeko, Kuril Islands", 156.01, 50.68, {"asia"}),
+    ("Wrangel Island", -179.5, 71.2, {"asia"}),
+    ("Shishaldin", -163.97, 54.75, {"north america"}),
+    ("Cleveland", -169.9, 52.8, {"north america"}),
+    ("Great Sitkin", -176.1, 52.08, {"north america"}),
+    ("Semisopochnoi", 179.6, 51.9, {"north america"}),
+    ("Kilauea", -155.29, 19.41, {"north america", "oceania"}),
+    ("Sydney", 151.2, -33.9, {"oceania"}),
+    ("Ruapehu", 175.57, -39.28, {"oceania"}),
+    ("Guam", 144.8, 13.4, {"oceania"}),
+    ("Anatahan", 145.67, 16.35, {"oceania"}),
+    ("Hunga Tonga", -175.39, -20.55, {"oceania"}),
+    ("Tahiti", -149.4, -17.6, {"oceania"}),
+    # Outside every outline, assigned to the nearest region
+    ("Puerto Rico", -66.5, 18.2, {"north america"}),
+    ("Soufriere Hills, Montserrat", -62.18, 16.72, {"north america"}),
+    ("La Soufriere, Guadeloupe", -61.66, 16.04, {"north america"}),
+    ("La Soufriere, St Vincent", -61.18, 13.33, {"north america"}),
+    ("Bahamas", -77.35, 25.05, {"north america"}),
+    ("Bermuda", -64.78, 32.3, {"north america"}),
+    ("Fogo, Cape Verde", -24.35, 14.95, {"africa"}),
+    ("Azores", -28.0, 38.6, {"europe"}),
+    ("La Palma", -17.86, 28.57, {"africa"}),
+    ("Piton de la Fournaise, Reunion", 55.71, -21.24, {"africa"}),
+    ("Mauritius", 57.55, -20.25, {"africa"}),
+    ("Cyprus", 33.0, 35.0, {"asia"}),
+    ("Galapagos", -91.13, -0.83, {"south america"}),
+    ("Falkland Islands", -59.0, -51.7, {"south america"}),
+    ("Socotra", 53.8, 12.5, {"africa"}),
+    ("Sao Tome", 6.6, 0.3, {"africa"}),
+    # Open ocean beyond the nearest-region reach
+    ("Mid-Atlantic", -40.0, 30.0, set()),
+    ("Tristan da Cunha", -12.3, -37.1, set()),
+]
+
+
+def point_event(event_id: str, lon: float, lat: float) -> Event:
+    return Event(
+        id=event_id,
+        title=event_id,
+        categories=[],
+        geometries=[{"date": "2026-01-01T00:00:00Z", "type": "Point", "coordinates": [lon, lat]}],
+        sources=[],
+    )
+
+
+@pytest.mark.parametrize("place, lon, lat, expected", KNOWN_LOCATIONS, ids=[row[0] for row in KNOWN_LOCATIONS])
+def test_known_locations(place, lon, lat, expected):
+    [regions] = RegionClassifier().classify([point_event(place, lon, lat)])
+    assert regions == expected
+
+
+def test_classify_batch_matches_single_events():
+    events = [point_event(place, lon, lat) for place, lon, lat, _ in KNOWN_LOCATIONS]
+    results = RegionClassifier().classify(events)
+    assert results == [frozenset(expected) for *_, expected in KNOWN_LOCATIONS]
+
+
+def test_event_in_several_regions_keeps_all():
+    event = point_event("track", 15.0, 37.75)
+    event.geometries.append(event.geometries[0].model_copy(update={"coordinates": [139.7, 35.7]}))
+    [regions] = RegionClassifier().classify([event])
+    assert regions == {"europe", "asia"}
+
+
+def test_filter_keeps_unknown_regions_unfiltered():
+    classifier = RegionClassifier()
+    events = [point_event("etna", 15.0, 37.75), point_event("tokyo", 139.7, 35.7)]
+    assert classifier.filter(events, "asia") == [events[1]]
+    assert classifier.filter(events, "all") == events
+    assert classifier.filter(events, None) == events
@@ -0,0 +1,63 @@
+import gzip
+from starlette.requests import Request
+from services.response_cache import EncodedResponse, ResponseCache, render_response
+
+BODY = b'{"events":[' + b",".join(b'{"id":"EONET_%d"}' % i for i in range(100)) + b"]}"
+
+
+def make_request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_entries_are_dropped_when_the_snapshot_version_changes():
+    cache = ResponseCache(maxsize=8)
+    cache.put("wildfires", 1, BODY)
+    assert cache.get("wildfires", 1).body == BODY
+    assert cache.get("wildfires", 2) is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(maxsize=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, 1, BODY)
+    assert cache.get("a", 1) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cached_entries_are_precompressed():
+    encoded = ResponseCache().put("key", 1, BODY)
+    assert encoded.gzip is not None
+
+
+def test_uncached_bodies_compress_only_the_negotiated_encoding():
+    encoded = EncodedResponse(BODY, precompress=False)
+    assert encoded.gzip is None and encoded.br is None
+
+    response = render_response(make_request(accept_encoding="gzip"), encoded)
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body) == BODY
+    assert encoded.br is None
+
+
+def test_identity_when_no_encoding_is_accepted():
+    encoded = EncodedResponse(BODY, precompress=False)
+    response = render_response(make_request(), encoded)
+    assert "content-encoding" not in response.headers
+    assert response.body == BODY
+    assert encoded.gzip is None and encoded.br is None
+
+
+def test_small_bodies_are_not_compressed():
+    encoded = EncodedResponse(b"{}")
+    response = render_response(make_request(accept_encoding="gzip, br"), encoded)
+    assert "content-encoding" not in response.headers
+
+
+def test_matching_etag_returns_not_modified():
+    encoded = EncodedResponse(BODY)
+    response = render_response(make_request(if_none_match=f'W/{encoded.etag}'), encoded)
+    assert response.status_code == 304
+    assert response.headers["etag"] == encoded.etag